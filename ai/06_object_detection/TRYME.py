@@ -8,122 +8,296 @@ Het kan werken met webcam, video bestanden en afbeeldingen.
 
 Gebruik:
     python TRYME.py --input webcam
+    python TRYME.py --input rtsp://camera/stream --headless --results live.jsonl
     python TRYME.py --input video.mp4 --output result.mp4
     python TRYME.py --input image.jpg --save-image
 """
 
+import time
+_MODULE_START = time.perf_counter()
+
 import argparse
+from contextlib import contextmanager
 import cv2
+import importlib.util
 import numpy as np
 import os
-from PIL import Image, ImageDraw
-import matplotlib.pyplot as plt
+import shutil
+import tempfile
+from PIL import Image
 from pathlib import Path
-import time
 
-# Probeer transformers en torch te importeren
-try:
-    import torch
-    from transformers import DetrImageProcessor, DetrForObjectDetection
-    TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    TRANSFORMERS_AVAILABLE = False
-    torch = None
-    print("⚠️  Transformers/PyTorch niet geïnstalleerd. Installeer met: pip install transformers torch")
+from cascade import CascadeDetector
+from detection_cache import pil_hash
+from detection_results import Detections, JsonlResultsWriter
+from detection_renderer import DetectionRenderer
+from detection_store import DetectionStore, probe_video
+from detection_stats import DetectionStats, format_snapshot
+from detectors import BACKENDS, Detector, create_detector
+from detr_preprocessing import DetrPreprocessor, excluded_label_ids, keep_detections
+from functools import partial
+from image_batch import is_batch_input, process_image_batch
+from live_capture import LatestFrameCapture, LiveDetector, is_live_source
+from onnx_backend import DEFAULT_ONNX_DIR, export_onnx
+from frame_scheduler import AdaptiveFrameScheduler, FixedIntervalScheduler, SceneChangeGate
+from tiling import TiledDetector
+from tracker import IoUTracker
+from video_pipeline import MAX_BUFFER_FRAMES, run_pipeline, print_pipeline_report
+from video_shards import process_video_sharded, threads_per_worker
+from video_writers import ENCODERS, VideoEncoder
+
+# Torch, transformers en matplotlib zijn zwaar om te importeren (seconden).
+# Ze worden pas geladen als ze echt nodig zijn, zodat bv. --create-sample en
+# --help direct starten. Zie load_transformers().
+TRANSFORMERS_AVAILABLE = all(importlib.util.find_spec(name) for name in ("torch", "transformers"))
+torch = None
+DetrImageProcessor = None
+DetrForObjectDetection = None
+
+# Lokale kopie van het model (safetensors, wordt via mmap geladen), zodat een
+# herstart niet opnieuw de Hugging Face hub raadpleegt
+DEFAULT_MODEL_CACHE = os.environ.get(
+    "DETECTION_MODEL_CACHE", os.path.join(Path.home(), ".cache", "object_detection")
+)
+
+# (stap, seconden) voor --profile-startup
+STARTUP_TIMINGS = []
+
+@contextmanager
+def startup_step(name):
+    """Meet hoe lang een stap tijdens het opstarten duurt"""
+    start = time.perf_counter()
+    yield
+    STARTUP_TIMINGS.append((name, time.perf_counter() - start))
+
+def load_transformers():
+    """Importeer torch en transformers bij eerste gebruik"""
+    global torch, DetrImageProcessor, DetrForObjectDetection
+    if torch is not None:
+        return
+    if not TRANSFORMERS_AVAILABLE:
+        raise ImportError("Transformers library is required")
+    
+    with startup_step("import torch"):
+        import torch as _torch
+    with startup_step("import transformers"):
+        from transformers import DetrImageProcessor as _processor, DetrForObjectDetection as _model
+    torch, DetrImageProcessor, DetrForObjectDetection = _torch, _processor, _model
+
+def configure_torch_threads(num_threads=None, num_interop_threads=None):
+    """Stel het aantal torch CPU threads in (None = torch default)"""
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    if num_interop_threads:
+        try:
+            torch.set_num_interop_threads(num_interop_threads)
+        except RuntimeError:
+            # Kan maar één keer, en alleen voordat torch parallel werk heeft gedaan
+            print("⚠️  Interop threads konden niet meer worden ingesteld")
+
+def print_startup_profile():
+    """Print waar de opstarttijd naartoe gaat"""
+    print("\n⏱️  Opstart profiel:")
+    module_imports = _MAIN_START - _MODULE_START if _MAIN_START else 0.0
+    rows = [("basis imports (cv2, numpy, PIL)", module_imports)] + STARTUP_TIMINGS
+    total = sum(seconds for _, seconds in rows)
+    for name, seconds in rows:
+        share = seconds / total * 100 if total else 0
+        print(f"  {name:<34} {seconds:>7.2f}s  {share:>5.1f}%")
+    print(f"  {'totaal':<34} {total:>7.2f}s")
+    print("  Tip: python -X importtime TRYME.py ... geeft details per module")
+
+# Gezet door main(), voor het opstart profiel
+_MAIN_START = None
 
-class SimpleObjectDetector:
+class SimpleObjectDetector(Detector):
     """Eenvoudige object detector met DETR model"""
     
-    def __init__(self, model_name="facebook/detr-resnet-50", confidence_threshold=0.8):
-        if not TRANSFORMERS_AVAILABLE:
-            raise ImportError("Transformers library is required")
+    def __init__(self, model_name="facebook/detr-resnet-50", confidence_threshold=0.8,
+                 cache_dir=DEFAULT_MODEL_CACHE, quantize=False, num_threads=None, num_interop_threads=None,
+                 result_cache=None, result_cache_size=10000):
+        """
+        Args:
+            quantize: CPU modus, dynamische int8 quantisatie van alle nn.Linear lagen
+                      (de transformer); sneller, iets minder nauwkeurig
+            num_threads: aantal threads binnen één operatie (torch.set_num_threads)
+            num_interop_threads: aantal threads tussen operaties (torch.set_num_interop_threads)
+            result_cache: DetectionCache of pad naar een SQLite bestand; identieke
+                          beelden worden dan niet opnieuw door het model gehaald
+            result_cache_size: maximum aantal items als result_cache een pad is
+        """
+        load_transformers()
+        configure_torch_threads(num_threads, num_interop_threads)
         
         print(f"🔄 Model laden: {model_name}")
-        self.processor = DetrImageProcessor.from_pretrained(model_name)
-        self.model = DetrForObjectDetection.from_pretrained(model_name)
+        self.processor, self.model = self._load_pretrained(model_name, cache_dir)
         self.confidence_threshold = confidence_threshold
         
         # GPU ondersteuning
-        if torch is not None:
-            self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        with startup_step("model naar device"):
+            self.device = torch.device("cuda" if torch.cuda.is_available() and not quantize else "cpu")
             self.model.to(self.device)
-            print(f"✅ Model geladen op: {self.device}")
-        else:
-            self.device = "cpu"
         
-    def detect_objects(self, image):
-        """Detecteer objecten in een PIL Image"""
-        # Preprocessing
-        inputs = self.processor(images=image, return_tensors="pt")
-        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        # Gequantiseerde int8 kernels bestaan alleen voor CPU
+        self.quantized = quantize
+        if quantize:
+            with startup_step("int8 quantisatie"):
+                from torch.ao.quantization import quantize_dynamic
+                self.model = quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
         
-        # Inference
-        with torch.no_grad():
-            outputs = self.model(**inputs)
+        # Detectie cache: de key bevat model en threshold, int8 geeft andere detecties
+        self.name = model_name + ("-int8" if quantize else "")
+        self.use_result_cache(result_cache, result_cache_size)
         
-        # Postprocessing
-        target_sizes = torch.tensor([image.size[::-1]]).to(self.device)
-        results = self.processor.post_process_object_detection(
-            outputs, target_sizes=target_sizes, threshold=self.confidence_threshold
-        )[0]
+        # Classes to exclude (often confused with furniture), als label ids
+        self._excluded_ids = excluded_label_ids(self.model.config.id2label)
+        
+        # Hergebruikte buffers voor detect_frames
+        self._preprocessor = DetrPreprocessor.from_processor(self.processor)
+        self._input_buffers = None
+        
+        print(f"✅ Model geladen op: {self.device}{' (int8)' if quantize else ''}, "
+              f"{torch.get_num_threads()} threads")
+    
+    @staticmethod
+    def _load_pretrained(model_name, cache_dir):
+        """
+        Laad processor en model, bij voorkeur uit de lokale cache.
+        
+        De eerste keer komt het model van de Hugging Face hub en wordt het als
+        safetensors in cache_dir opgeslagen. Daarna laadt het offline uit die
+        map (local_files_only), zonder netwerk requests. cache_dir=None zet
+        de cache uit.
+        """
+        local_dir = Path(cache_dir) / model_name.replace("/", "--") if cache_dir else None
         
-        # Resultaten formatteren met filtering
-        detections = []
-        # Classes to exclude (often confused with furniture)
-        excluded_classes = {"sports ball", "frisbee", "ball"}
+        if local_dir and (local_dir / "config.json").exists():
+            with startup_step("processor laden (cache)"):
+                processor = DetrImageProcessor.from_pretrained(local_dir, local_files_only=True)
+            with startup_step("model laden (cache)"):
+                model = DetrForObjectDetection.from_pretrained(local_dir, local_files_only=True)
+            return processor, model.eval()
         
-        for score, label, box in zip(results["scores"], results["labels"], results["boxes"]):
-            label_name = self.model.config.id2label[label.item()]
+        with startup_step("processor laden (hub)"):
+            processor = DetrImageProcessor.from_pretrained(model_name)
+        with startup_step("model laden (hub)"):
+            model = DetrForObjectDetection.from_pretrained(model_name)
+        
+        if local_dir:
+            with startup_step("model cache schrijven"):
+                # De backbone gewichten zitten al in het model, niet opnieuw downloaden
+                model.config.use_pretrained_backbone = False
+                processor.save_pretrained(local_dir)
+                model.save_pretrained(local_dir, safe_serialization=True)
+            print(f"💾 Model gecached in: {local_dir}")
+        
+        return processor, model.eval()
+        
+    def detect_objects(self, image):
+        """Detecteer objecten in een PIL Image (via de processor) of een BGR frame"""
+        if isinstance(image, np.ndarray):
+            return self.detect_frames([image])[0]
+        return self.detect_batch([image])[0]
+    
+    def detect_batch(self, images, batch_size=8):
+        """Detecteer objecten in een lijst PIL Images, batch_size per forward pass"""
+        return self._detect_cached(images, pil_hash, self._detect_pil, batch_size)
+    
+    def _detect_pil(self, images, batch_size):
+        all_detections = []
+        
+        for start in range(0, len(images), batch_size):
+            batch = images[start:start + batch_size]
             
-            # Skip excluded classes unless confidence is very high
-            if label_name.lower() in excluded_classes and score.item() < 0.95:
-                continue
-                
-            detections.append({
-                "label": label_name,
-                "confidence": score.item(),
-                "box": box.cpu().numpy().astype(int)  # [x_min, y_min, x_max, y_max]
-            })
+            # Preprocessing: de processor padt alle frames naar één tensor (+ pixel_mask)
+            inputs = self.processor(images=batch, return_tensors="pt")
+            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+            
+            # Originele grootte (hoogte, breedte) per frame
+            sizes = [image.size[::-1] for image in batch]
+            all_detections.extend(self._infer(inputs, sizes))
         
-        return detections
-
-def draw_detections_pil(image, detections):
-    """Teken detecties op PIL image"""
-    draw = ImageDraw.Draw(image)
+        return all_detections
     
-    for detection in detections:
-        box = detection["box"]
-        label = detection["label"]
-        confidence = detection["confidence"]
+    def _detect_bgr(self, frames, batch_size):
+        """
+        BGR frames zonder PIL (via detect_frames).
+        
+        Resize en normalisatie gebeuren met NumPy/OpenCV direct in een
+        hergebruikte input tensor, in plaats van BGR -> RGB -> PIL -> NumPy
+        kopieën per frame zoals via de processor.
+        """
+        all_detections = []
         
-        # Bounding box
-        draw.rectangle(box.tolist(), outline="red", width=3)
+        for start in range(0, len(frames), batch_size):
+            batch = frames[start:start + batch_size]
+            inputs = self._preprocess_frames(batch)
+            sizes = [frame.shape[:2] for frame in batch]
+            all_detections.extend(self._infer(inputs, sizes))
         
-        # Label
-        text = f"{label}: {confidence:.2f}"
-        draw.text((box[0], max(0, box[1] - 20)), text, fill="red")
+        return all_detections
     
-    return image
-
-def draw_detections_cv2(frame, detections):
-    """Teken detecties op OpenCV frame"""
-    for detection in detections:
-        box = detection["box"]
-        label = detection["label"]
-        confidence = detection["confidence"]
+    def _infer(self, inputs, sizes):
+        """Forward pass + postprocessing voor een voorbewerkte batch"""
+        # Inference: één forward pass voor de hele batch
+        with torch.inference_mode():
+            outputs = self.model(**inputs)
         
-        # Bounding box
-        cv2.rectangle(frame, (box[0], box[1]), (box[2], box[3]), (0, 255, 0), 2)
+        # Postprocessing in één aanroep, met de originele grootte per frame
+        target_sizes = torch.tensor(sizes).to(self.device)
+        results = self.processor.post_process_object_detection(
+            outputs, target_sizes=target_sizes, threshold=self.confidence_threshold
+        )
         
-        # Label
-        text = f"{label}: {confidence:.2f}"
-        cv2.putText(frame, text, (box[0], max(30, box[1] - 10)), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+        return [self._format_results(result) for result in results]
     
-    return frame
+    def _preprocess_frames(self, frames):
+        """
+        BGR frames -> pixel_values (N, 3, H, W) en pixel_mask (N, H, W), zoals de processor.
+        
+        De tensors worden bewaard en hergebruikt zolang de batch dezelfde vorm
+        heeft (bij video altijd); de NumPy kant staat in detr_preprocessing.py.
+        """
+        target_sizes, shape = self._preprocessor.target_sizes(frames)
+        
+        if self._input_buffers is None or self._input_buffers[0].shape != shape:
+            pin = self.device.type == "cuda"
+            self._input_buffers = (
+                torch.empty(shape, dtype=torch.float32, pin_memory=pin),
+                torch.empty((shape[0],) + shape[2:], dtype=torch.long, pin_memory=pin),
+            )
+        pixel_values, pixel_mask = self._input_buffers
+        self._preprocessor.fill(frames, target_sizes, pixel_values.numpy(), pixel_mask.numpy())
+        
+        return {
+            "pixel_values": pixel_values.to(self.device, non_blocking=True),
+            "pixel_mask": pixel_mask.to(self.device, non_blocking=True),
+        }
+    
+    def _format_results(self, results):
+        """Zet post-processing output van één frame om naar Detections"""
+        scores = results["scores"].cpu().numpy()
+        label_ids = results["labels"].cpu().numpy()
+        boxes = results["boxes"].cpu().numpy()  # [x_min, y_min, x_max, y_max]
+        
+        # Skip excluded classes unless confidence is very high
+        keep = keep_detections(scores, label_ids, self._excluded_ids)
+        return Detections(boxes[keep], scores[keep], label_ids[keep], self.model.config.id2label)
+
+# Gecachte label sprites; PIL images zijn RGB, OpenCV frames BGR
+PIL_RENDERER = DetectionRenderer(color=(255, 0, 0), thickness=3)
+CV2_RENDERER = DetectionRenderer(color=(0, 255, 0), thickness=2)
+
+def draw_detections_pil(image, detections):
+    """Teken detecties op PIL image (geeft een nieuwe image terug)"""
+    return Image.fromarray(PIL_RENDERER.draw(np.array(image), detections))
+
+def draw_detections_cv2(frame, detections):
+    """Teken detecties op OpenCV frame (in place), met track ID als de detectie gevolgd wordt"""
+    return CV2_RENDERER.draw(frame, detections)
 
-def process_image(image_path, detector, save_result=False):
-    """Process een enkele afbeelding"""
+def process_image(image_path, detector, save_result=False, show=True):
+    """Process een enkele afbeelding (show=False: geen matplotlib venster)"""
     print(f"🖼️  Processing afbeelding: {image_path}")
     
     # Afbeelding laden
@@ -153,6 +327,11 @@ def process_image(image_path, detector, save_result=False):
         print(f"💾 Resultaat opgeslagen: {output_path}")
     
     # Tonen
+    if not show:
+        return detections
+    
+    import matplotlib.pyplot as plt
+    
     plt.figure(figsize=(12, 8))
     plt.imshow(result_image)
     plt.axis('off')
@@ -162,71 +341,226 @@ def process_image(image_path, detector, save_result=False):
     
     return detections
 
-def process_webcam(detector):
-    """Process webcam feed real-time"""
-    print("📹 Webcam openen... (druk 'q' om te stoppen)")
+def create_scheduler(adaptive, target_fps, source_fps, default_interval=3):
+    """Kies een vaste of adaptieve frame scheduler; target_fps None = real-time"""
+    if not adaptive:
+        return FixedIntervalScheduler(default_interval)
+    if not target_fps:
+        # Camera's melden soms 0 FPS
+        target_fps = source_fps if source_fps and source_fps > 0 else 30
+    return AdaptiveFrameScheduler(target_fps)
+
+def process_webcam(detector, source=0, target_fps=None, scene_threshold=None, output_path=None,
+                   results_path=None, headless=False, encoder=None):
+    """
+    Process een webcam of stream (rtsp://, http://) real-time.
     
-    cap = cv2.VideoCapture(0)
+    Capture, detectie en weergave/opslaan lopen in aparte threads (zie
+    live_capture.py): het model pakt steeds het nieuwste frame, dus de
+    vertraging loopt niet op als het model trager is dan de camera. Elke
+    detectie krijgt de glass-to-detection latency mee.
     
-    if not cap.isOpened():
+    Args:
+        target_fps: maximaal aantal detecties per seconde (None = zo snel als het model kan)
+        scene_threshold: geen detectie als het beeld niet veranderd is
+        output_path: sla de frames met detecties op als video
+        results_path: detecties als JSON Lines, met captured_at en latency_ms per regel
+        headless: geen venster; stoppen met Ctrl+C of als de stream eindigt
+    """
+    print(f"📹 Live bron openen: {source} (druk 'q' om te stoppen)")
+    
+    capture = LatestFrameCapture(source)
+    
+    if not capture.isOpened():
         print("❌ Kan webcam niet openen")
         return
     
-    frame_count = 0
-    fps_counter = 0
-    start_time = time.time()
+    gate = SceneChangeGate(scene_threshold) if scene_threshold is not None else None
+    results_writer = JsonlResultsWriter(results_path, fps=0) if results_path else None
+    if results_writer:
+        print(f"📝 Detecties worden opgeslagen naar: {results_path}")
+    live = LiveDetector(detector, capture, gate=gate, max_fps=target_fps, results_writer=results_writer)
+    writer = None
     
+    frames_shown = 0
+    last_index = -1
+    start_time = last_report = time.perf_counter()
+    
+    capture.start()
+    live.start()
     try:
         while True:
-            ret, frame = cap.read()
-            if not ret:
+            # Model gecrasht: direct stoppen (live.stop() gooit de fout op) in plaats van door te gaan zonder detecties
+            if live.error is not None:
                 break
+            captured = capture.read(after=last_index, timeout=1.0)
+            if captured is None:
+                if capture.stopped:
+                    break
+                continue
+            last_index = captured.index
             
-            # Process elke 5e frame voor betere performance
-            if frame_count % 5 == 0:
-                # OpenCV naar PIL
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                pil_image = Image.fromarray(rgb_frame)
-                
-                # Object detection
-                detections = detector.detect_objects(pil_image)
-                
-                # Tekenen op frame
-                frame = draw_detections_cv2(frame, detections)
-                
-                # FPS berekenen
-                fps_counter += 1
-                if fps_counter % 10 == 0:
-                    elapsed = time.time() - start_time
-                    fps = fps_counter / elapsed
-                    print(f"🚀 Processing FPS: {fps:.1f}")
+            # Kopie: het model kan ditzelfde frame nog aan het lezen zijn
+            frame = captured.image.copy()
+            result = live.latest()
+            if result is not None:
+                frame = draw_detections_cv2(frame, result.detections)
             
             # Info op frame
-            cv2.putText(frame, f"Frame: {frame_count}", (10, 30), 
+            cv2.putText(frame, f"Frame: {captured.index}", (10, 30), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+            if result is not None:
+                cv2.putText(frame, f"Latency: {result.latency * 1000:.0f} ms", (10, 60),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
             
-            # Tonen
-            cv2.imshow('Object Detection - Druk Q om te stoppen', frame)
-            
-            # Stoppen met 'q'
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                break
+            if output_path:
+                if writer is None:
+                    fps = capture.fps if capture.fps and capture.fps > 0 else 30
+                    encoder = encoder or VideoEncoder()
+                    writer = encoder.open(output_path, frame.shape[1], frame.shape[0], fps)
+                    print(f"💾 Output wordt opgeslagen naar: {output_path} ({encoder.describe()})")
+                writer.write(frame)
             
-            frame_count += 1
+            # Tonen
+            if not headless:
+                cv2.imshow('Object Detection - Druk Q om te stoppen', frame)
+                
+                # Stoppen met 'q'
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
             
+            # FPS en latency elke paar seconden
+            frames_shown += 1
+            now = time.perf_counter()
+            if now - last_report >= 5:
+                elapsed = now - start_time
+                print(f"🚀 Detectie FPS: {live.detections_done / elapsed:.1f}, "
+                      f"weergave FPS: {frames_shown / elapsed:.1f}, latency {live.latency.describe()}")
+                last_report = now
+    except KeyboardInterrupt:
+        print("⏹️  Gestopt door gebruiker")
     finally:
-        cap.release()
-        cv2.destroyAllWindows()
+        capture.close()
+        try:
+            live.stop()
+        finally:
+            if writer:
+                writer.release()
+            if results_writer:
+                results_writer.close()
+            if not headless:
+                cv2.destroyAllWindows()
+    
+    print(f"⏱️  Live: {capture.frames_read} frames gelezen, {frames_shown} getoond; {live.describe()}")
+    if gate:
+        print(f"🪞 Scene gate: {gate.describe()}")
 
-def process_video(video_path, detector, output_path=None):
-    """Process video bestand"""
+class FrameBatchProcessor:
+    """
+    Detecteert objecten op de keyframes van een buffer frames en tekent ze.
+    
+    Alle keyframes in een buffer gaan samen door detector.detect_frames. De
+    gemeten inference tijd gaat naar de scheduler. Frames zonder detectie
+    krijgen de laatst bekende detecties getekend, of met een tracker de
+    voorspelde positie van elk gevolgd object. Met een gate slaan keyframes
+    waarop niets veranderd is het model over en hergebruiken ze de detecties
+    van het vorige keyframe.
+    """
+    
+    def __init__(self, detector, scheduler, batch_size=8, draw=True, tracker=None, gate=None,
+                 stats_interval=None):
+        self.detector = detector
+        self.scheduler = scheduler
+        self.batch_size = batch_size
+        self.draw = draw
+        self.tracker = tracker
+        self.gate = gate
+        # Streaming statistieken, met een tussenstand elke stats_interval seconden
+        self.detection_stats = DetectionStats(snapshot_interval=stats_interval)
+        self.last_detections = []
+        # Detecties van het laatste keyframe (voor de tracker), voor keyframes zonder verandering
+        self.last_keyframe_detections = []
+        # Frames komen altijd op volgorde binnen, dus de index kan hier geteld worden
+        self.frame_index = 0
+    
+    def __call__(self, frames):
+        """
+        frames is een lijst (is_keyframe, frame) tuples. Geeft in volgorde
+        (frame, detections, is_keyframe) terug. Voor overgeslagen frames is
+        detections None, behalve met een tracker (dan de voorspelde boxes).
+        """
+        keyframes = [frame for is_keyframe, frame in frames if is_keyframe]
+        
+        # Alleen keyframes waarop genoeg veranderd is gaan naar het model
+        changed = [self.gate.changed(frame) if self.gate else True for frame in keyframes]
+        to_detect = [frame for frame, is_changed in zip(keyframes, changed) if is_changed]
+        
+        # Object detection in batches, direct op de BGR frames; tijd meten voor de scheduler
+        start_time = time.perf_counter()
+        batch_detections = iter(self.detector.detect_frames(to_detect, batch_size=self.batch_size))
+        if to_detect:
+            self.scheduler.record_latency(time.perf_counter() - start_time, len(to_detect))
+        changed = iter(changed)
+        
+        results = []
+        for is_keyframe, frame in frames:
+            detections = None
+            if is_keyframe:
+                if next(changed):
+                    self.last_keyframe_detections = next(batch_detections)
+                detections = self.last_keyframe_detections
+                new_tracks = ()
+                if self.tracker:
+                    detections, new_tracks = self.tracker.update(self.frame_index, detections)
+                self.last_detections = detections
+                
+                # Statistieken bijhouden
+                self.detection_stats.update(detections, new_tracks)
+            elif self.tracker:
+                detections = self.tracker.predict(self.frame_index)
+                self.last_detections = detections
+            
+            # Tekenen op frame (niet nodig als er geen video of preview is);
+            # overgeslagen frames hergebruiken de laatste (of voorspelde) detecties
+            if self.draw:
+                frame = draw_detections_cv2(frame, self.last_detections)
+            results.append((frame, detections, is_keyframe))
+            self.frame_index += 1
+        
+        snapshot = self.detection_stats.periodic_snapshot()
+        if snapshot is not None:
+            print(f"📊 Tussenstand (frame {self.frame_index}): {format_snapshot(snapshot)}")
+        
+        return results
+
+def process_video(video_path, detector, output_path=None, batch_size=8, pipeline=False,
+                  headless=False, results_path=None, adaptive=False, target_fps=None, track=False,
+                  start_frame=0, end_frame=None, scene_threshold=None, stats_interval=30, store_path=None,
+                  encoder=None):
+    """
+    Process video bestand, geeft de detectie statistieken terug
+    
+    Args:
+        pipeline: lezen, detectie en schrijven in aparte threads
+        headless: geen cv2.imshow/waitKey, voor servers zonder scherm
+        results_path: schrijf detecties per frame naar een JSON Lines bestand
+        adaptive: kies de te detecteren frames op basis van de inference tijd
+        target_fps: doel verwerkingssnelheid voor adaptive (default: FPS van de video)
+        track: volg objecten tussen keyframes (track IDs, boxes op elk frame)
+        start_frame, end_frame: verwerk alleen frames [start_frame, end_frame)
+        scene_threshold: hergebruik de vorige detecties als minder dan dit percentage
+                         van een keyframe veranderd is (SceneChangeGate)
+        stats_interval: print elke zoveel seconden een tussenstand van de statistieken
+        store_path: sla de detecties ook op in een DetectionStore (SQLite, doorzoekbaar)
+        encoder: VideoEncoder voor output_path (default: OpenCV mp4v)
+    """
     print(f"🎬 Processing video: {video_path}")
     
     cap = cv2.VideoCapture(str(video_path))
     
     if not cap.isOpened():
         print(f"❌ Kan video niet openen: {video_path}")
-        return
+        return DetectionStats()
     
     # Video properties
     fps = int(cap.get(cv2.CAP_PROP_FPS))
@@ -236,74 +570,206 @@ def process_video(video_path, detector, output_path=None):
     
     print(f"📊 Video info: {width}x{height}, {fps} FPS, {total_frames} frames")
     
+    # Alleen een deel van de video (bijv. één segment bij --workers)
+    if start_frame:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+    if end_frame is None:
+        # Sommige containers melden geen frame count: dan tot het einde lezen
+        end_frame = total_frames if total_frames > 0 else float("inf")
+    segment_frames = max(1, min(end_frame, total_frames or 1) - start_frame)
+    
     # Output video writer
     writer = None
     if output_path:
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        writer = cv2.VideoWriter(str(output_path), fourcc, fps, (width, height))
-        print(f"💾 Output wordt opgeslagen naar: {output_path}")
+        encoder = encoder or VideoEncoder()
+        writer = encoder.open(output_path, width, height, fps)
+        print(f"💾 Output wordt opgeslagen naar: {output_path} ({encoder.describe()})")
+    
+    # Detecties per frame (machine-readable)
+    results_writer = None
+    if results_path:
+        results_writer = JsonlResultsWriter(results_path, fps)
+        print(f"📝 Detecties worden opgeslagen naar: {results_path}")
+    
+    # Doorzoekbare store over alle runs heen
+    store = store_writer = None
+    if store_path:
+        store = DetectionStore(store_path)
+        video_id = store.add_video(video_path, fps, width, height, model=detector.name)
+        store_writer = store.writer(video_id, fps)
+        print(f"🗃️  Detecties worden opgeslagen in: {store_path}")
+    
+    # Cv2.imshow hoort niet buiten de main thread, dus de pipeline is altijd headless
+    show_preview = not (headless or pipeline)
+    draw = writer is not None or show_preview
+    
+    # Process standaard elke 3e frame
+    scheduler = create_scheduler(adaptive, target_fps, fps)
+    tracker = IoUTracker() if track else None
+    gate = SceneChangeGate(scene_threshold) if scene_threshold is not None else None
+    process_batch = FrameBatchProcessor(detector, scheduler, batch_size, draw, tracker, gate, stats_interval)
+    process_batch.frame_index = start_frame
+    print(f"⏭️  Frame scheduler: {scheduler.describe()}")
+    
+    frame_count = start_frame
+    
+    def read_frame():
+        """cap.read, maar stopt bij end_frame"""
+        nonlocal frame_count
+        if frame_count >= end_frame:
+            return False, None
+        ret, frame = cap.read()
+        if ret:
+            frame_count += 1
+        return ret, frame
+    
+    def handle_output(index, frame, detections, is_keyframe):
+        """Schrijf een verwerkt frame weg naar video en/of resultaten bestand"""
+        if writer:
+            writer.write(frame)
+        if results_writer and detections is not None:
+            results_writer.write(index, detections, keyframe=is_keyframe)
+        if store_writer and detections is not None:
+            store_writer.write(index, detections, keyframe=is_keyframe)
+    
+    if pipeline:
+        print("🧵 Pipeline modus: decode, detectie en encode in aparte threads")
+        try:
+            report = run_pipeline(
+                read_frame=read_frame,
+                process_batch=process_batch,
+                write_frame=lambda index, result: handle_output(start_frame + index, *result),
+                is_keyframe=lambda index: scheduler.should_detect(start_frame + index),
+                batch_size=batch_size,
+            )
+        finally:
+            cap.release()
+            if writer:
+                writer.release()
+            if results_writer:
+                results_writer.close()
+            if store:
+                store_writer.close()
+                store.close()
+        
+        print_pipeline_report(report)
+        print(f"⏭️  Frame scheduler: {scheduler.describe()}")
+        print_detection_stats(process_batch.detection_stats)
+        if gate:
+            print(f"🪞 Scene gate: {gate.describe()}")
+        return process_batch.detection_stats
     
-    frame_count = 0
-    detection_stats = {}
+    # Buffer met (is_keyframe, frame); wordt geleegd zodra er batch_size keyframes in zitten,
+    # of MAX_BUFFER_FRAMES frames bij een groot (adaptief) interval
+    buffer_limit = max(batch_size, MAX_BUFFER_FRAMES)
+    buffer = []
+    keyframes_in_buffer = 0
+    # Index van het eerste frame in de buffer
+    buffer_start = start_frame
+    stopped = False
     
     try:
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
+        while not stopped:
+            index = frame_count
+            ret, frame = read_frame()
             
-            # Progress
-            progress = (frame_count / total_frames) * 100
-            if frame_count % 30 == 0:  # Elke seconde bij 30fps
-                print(f"🔄 Progress: {progress:.1f}%")
-            
-            # Process elke 3e frame
-            if frame_count % 3 == 0:
-                # OpenCV naar PIL
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                pil_image = Image.fromarray(rgb_frame)
-                
-                # Object detection
-                detections = detector.detect_objects(pil_image)
+            if ret:
+                # Progress
+                progress = ((index - start_frame) / segment_frames) * 100
+                if index % 30 == 0:  # Elke seconde bij 30fps
+                    print(f"🔄 Progress: {progress:.1f}% ({scheduler.describe()})")
                 
-                # Statistieken bijhouden
-                for detection in detections:
-                    label = detection["label"]
-                    confidence = detection["confidence"]
-                    if label not in detection_stats:
-                        detection_stats[label] = {"count": 0, "confidences": []}
-                    detection_stats[label]["count"] += 1
-                    detection_stats[label]["confidences"].append(confidence)
-                
-                # Tekenen op frame
-                frame = draw_detections_cv2(frame, detections)
+                is_keyframe = scheduler.should_detect(index)
+                buffer.append((is_keyframe, frame))
+                keyframes_in_buffer += is_keyframe
             
-            # Opslaan
-            if writer:
-                writer.write(frame)
+            # Batch vol (of video klaar): detecteren, tekenen en wegschrijven
+            if buffer and (keyframes_in_buffer >= batch_size or len(buffer) >= buffer_limit or not ret):
+                results = process_batch(buffer)
+                for offset, (output_frame, detections, is_keyframe) in enumerate(results):
+                    # Opslaan
+                    handle_output(buffer_start + offset, output_frame, detections, is_keyframe)
+                    
+                    # Live preview (optioneel)
+                    if show_preview:
+                        cv2.imshow('Processing Video - Druk Q om te stoppen', output_frame)
+                        if cv2.waitKey(1) & 0xFF == ord('q'):
+                            stopped = True
+                            break
+                buffer_start += len(buffer)
+                buffer = []
+                keyframes_in_buffer = 0
             
-            # Live preview (optioneel)
-            cv2.imshow('Processing Video - Druk Q om te stoppen', frame)
-            if cv2.waitKey(1) & 0xFF == ord('q'):
+            if not ret:
                 break
             
-            frame_count += 1
-            
     finally:
         cap.release()
         if writer:
             writer.release()
-        cv2.destroyAllWindows()
+        if results_writer:
+            results_writer.close()
+        if store:
+            store_writer.close()
+            store.close()
+        if show_preview:
+            cv2.destroyAllWindows()
     
     # Statistieken printen
+    print_detection_stats(process_batch.detection_stats)
+    if gate:
+        print(f"🪞 Scene gate: {gate.describe()}")
+    return process_batch.detection_stats
+
+def build_detector(backend="detr", tile_size=None, tile_overlap=0.2, roi=None, cascade=None,
+                   cascade_labels=None, cascade_below=0.6, cascade_keyframes=30, **detector_kwargs):
+    """
+    DETR uit dit script, of een andere backend via detectors.create_detector.
+    
+    DETR wordt hier direct gemaakt (niet via create_detector), zodat het
+    opstart profiel in deze module blijft als TRYME.py als script draait.
+    Met tile_size of roi wordt de detector in een TiledDetector verpakt, met
+    cascade (een snelle backend) in een CascadeDetector die hem alleen op de
+    belangrijke frames aanroept.
+    """
+    if backend in ("detr", "detr-int8"):
+        if detector_kwargs.get("confidence_threshold") is None:
+            detector_kwargs.pop("confidence_threshold", None)
+        detector_kwargs["quantize"] = detector_kwargs.get("quantize", False) or backend == "detr-int8"
+        detector = SimpleObjectDetector(**detector_kwargs)
+    else:
+        detector = create_detector(backend, **detector_kwargs)
+    if tile_size or roi:
+        detector = TiledDetector(detector, tile_size=tile_size, overlap=tile_overlap, roi_mask=roi)
+    if cascade:
+        cheap = create_detector(cascade, result_cache=detector_kwargs.get("result_cache"),
+                                result_cache_size=detector_kwargs.get("result_cache_size", 10000))
+        detector = CascadeDetector(cheap, detector, target_labels=cascade_labels, escalate_below=cascade_below,
+                                   keyframe_interval=cascade_keyframes)
+    return detector
+
+def process_video_segment(video_path, start_frame, end_frame, output_path, results_path,
+                          detector_kwargs, video_kwargs):
+    """Eén segment van een --workers run; draait in een eigen proces met een eigen detector"""
+    detector = build_detector(**detector_kwargs)
+    stats = process_video(video_path, detector, output_path, results_path=results_path,
+                          headless=True, start_frame=start_frame, end_frame=end_frame, **video_kwargs)
+    # Voor de videos tabel van --store: het hoofdproces bouwt zelf geen detector
+    stats.model = detector.name
+    if isinstance(detector, CascadeDetector):
+        print(f"🪜 Cascade (frames {start_frame}-{end_frame}): {detector.describe()}")
+    if detector.result_cache is not None:
+        print(f"🗄️  Detectie cache (frames {start_frame}-{end_frame}): {detector.result_cache.describe()}")
+    return stats
+
+def print_detection_stats(detection_stats):
+    """Print een samenvatting van de detectie statistieken"""
     print(f"\n📈 Detectie statistieken:")
-    for label, stats in sorted(detection_stats.items(), key=lambda x: x[1]["count"], reverse=True):
-        count = stats["count"]
-        confidences = stats["confidences"]
-        avg_conf = sum(confidences) / len(confidences)
-        min_conf = min(confidences)
-        max_conf = max(confidences)
-        print(f"  {label}: {count} detecties (avg: {avg_conf:.3f}, min: {min_conf:.3f}, max: {max_conf:.3f})")
+    for label, stats in detection_stats.items():
+        # Met tracking: aantal unieke objecten in plaats van alleen losse detecties
+        objects = f"{stats.objects} objecten, " if stats.objects else ""
+        print(f"  {label}: {objects}{stats.count} detecties (avg: {stats.mean:.3f}, std: {stats.std:.3f}, "
+              f"min: {stats.min:.3f}, p50: {stats.quantile(0.5):.3f}, max: {stats.max:.3f})")
 
 def create_sample_video_with_chair():
     """Maak een eenvoudige test video met een stoel (placeholder)"""
@@ -333,17 +799,97 @@ def create_sample_video_with_chair():
     print("✅ Sample video gemaakt: sample_chair_video.mp4")
 
 def main():
+    global _MAIN_START
+    _MAIN_START = time.perf_counter()
+    
     parser = argparse.ArgumentParser(description="Object Detection Demo")
     parser.add_argument("--input",  
-                       help="Input: 'webcam', image path, of video path")
+                       help="Input: 'webcam', camera index, stream URL (rtsp://...), image path, "
+                            "map/glob met afbeeldingen, of video path")
     parser.add_argument("--output", 
                        help="Output video pad (alleen voor video input)")
-    parser.add_argument("--confidence", type=float, default=0.8,
-                       help="Minimum confidence threshold (default: 0.8)")
+    parser.add_argument("--encoder", choices=ENCODERS, default="opencv",
+                       help="Hoe --output geschreven wordt: opencv (mp4v), ffmpeg (apart proces, instelbare codec) "
+                            "of none (geen video, alleen detecties in een .jsonl naast --output)")
+    parser.add_argument("--codec", default="libx264",
+                       help="ffmpeg codec voor --encoder ffmpeg, bijv. libx264, h264_nvenc, h264_qsv (default: libx264)")
+    parser.add_argument("--preset",
+                       help="Codec preset voor --encoder ffmpeg (default: veryfast voor libx264/libx265)")
+    parser.add_argument("--encode-threads", type=int,
+                       help="Aantal ffmpeg encoder threads (default: ffmpeg kiest)")
+    parser.add_argument("--backend", choices=BACKENDS, default="detr",
+                       help="Detector backend (default: detr); alle backends werken met dezelfde opties")
+    parser.add_argument("--confidence", type=float,
+                       help="Minimum confidence threshold (default: 0.8 voor DETR, 0.5 voor de andere backends)")
+    parser.add_argument("--batch-size", type=int, default=8,
+                       help="Aantal frames per forward pass bij video (default: 8)")
+    parser.add_argument("--pipeline", action="store_true",
+                       help="Video verwerken met aparte threads voor lezen, detectie en schrijven")
+    parser.add_argument("--adaptive", action="store_true",
+                       help="Kies te detecteren frames op basis van de gemeten inference tijd "
+                            "(alleen video bestanden; live bronnen detecteren altijd op het nieuwste frame)")
+    parser.add_argument("--target-fps", type=float,
+                       help="Video: doel verwerkingssnelheid voor --adaptive (default: FPS van de bron); "
+                            "webcam/stream: het maximum aantal detecties per seconde")
+    parser.add_argument("--track", action="store_true",
+                       help="Volg objecten tussen keyframes (track IDs en boxes op elk frame)")
+    parser.add_argument("--scene-threshold", type=float,
+                       help="Sla detectie over als minder dan dit percentage van het beeld veranderd is "
+                            "(bijv. 0.5); hergebruikt de vorige detecties")
+    parser.add_argument("--tile-size", type=int,
+                       help="Detecteer in overlappende tiles van N pixels (voor kleine objecten in grote beelden)")
+    parser.add_argument("--tile-overlap", type=float, default=0.2,
+                       help="Overlap tussen tiles als fractie van --tile-size (default: 0.2)")
+    parser.add_argument("--roi",
+                       help="Masker afbeelding (wit = hier kunnen objecten staan); alleen daar wordt gedetecteerd")
+    parser.add_argument("--cascade", choices=[b for b in BACKENDS if not b.startswith("detr")],
+                       help="Snelle backend die elk frame bekijkt; --backend draait alleen bij een doelklasse, "
+                            "twijfel of keyframe")
+    parser.add_argument("--cascade-labels",
+                       help="Komma-gescheiden doelklassen voor --cascade (default: elke detectie)")
+    parser.add_argument("--cascade-below", type=float, default=0.6,
+                       help="Snelle detecties onder deze confidence gaan naar --backend (default: 0.6)")
+    parser.add_argument("--cascade-keyframes", type=int, default=30,
+                       help="Elke N-de gedetecteerde frame altijd --backend (default: 30, 0 = nooit)")
+    parser.add_argument("--stats-interval", type=float, default=30,
+                       help="Seconden tussen tussenstanden van de statistieken bij video (default: 30)")
+    parser.add_argument("--headless", action="store_true",
+                       help="Geen vensters openen (voor servers zonder scherm)")
+    parser.add_argument("--workers", type=int,
+                       help="Verwerk de video in N segmenten, elk in een eigen proces")
+    parser.add_argument("--results",
+                       help="Schrijf detecties per frame naar een JSON Lines bestand (.jsonl)")
+    parser.add_argument("--store",
+                       help="Sla detecties van video's ook op in een doorzoekbaar SQLite bestand "
+                            "(zie detection_store.py)")
+    parser.add_argument("--resume", action="store_true",
+                       help="Map/glob input: sla afbeeldingen over die al in --results staan")
+    parser.add_argument("--decode-threads", type=int, default=4,
+                       help="Map/glob input: aantal threads voor het inlezen (default: 4)")
     parser.add_argument("--save-image", action="store_true",
                        help="Sla resultaat afbeelding op")
     parser.add_argument("--create-sample", action="store_true",
                        help="Maak sample video")
+    parser.add_argument("--model-cache", default=DEFAULT_MODEL_CACHE,
+                       help=f"Map voor de lokale model cache (default: {DEFAULT_MODEL_CACHE})")
+    parser.add_argument("--no-model-cache", action="store_true",
+                       help="Laad het model altijd van de Hugging Face hub")
+    parser.add_argument("--export-onnx", action="store_true",
+                       help="Exporteer het DETR model naar ONNX (in --onnx-model) voor --backend onnx/onnx-opencv")
+    parser.add_argument("--onnx-model", default=DEFAULT_ONNX_DIR,
+                       help=f"Map met het geëxporteerde ONNX model (default: {DEFAULT_ONNX_DIR})")
+    parser.add_argument("--result-cache",
+                       help="SQLite bestand met detecties per beeld-hash; identieke beelden slaan inference over")
+    parser.add_argument("--result-cache-size", type=int, default=10000,
+                       help="Maximum aantal beelden in --result-cache, oudste eerst eruit (default: 10000)")
+    parser.add_argument("--cpu-optimized", action="store_true",
+                       help="CPU modus: dynamische int8 quantisatie van de transformer")
+    parser.add_argument("--threads", type=int,
+                       help="Aantal torch threads per operatie (intra-op)")
+    parser.add_argument("--interop-threads", type=int,
+                       help="Aantal torch threads tussen operaties (inter-op)")
+    parser.add_argument("--profile-startup", action="store_true",
+                       help="Toon waar de import- en laadtijd naartoe gaat")
     
     args = parser.parse_args()
     
@@ -352,35 +898,134 @@ def main():
         create_sample_video_with_chair()
         return
     
+    cache_dir = None if args.no_model_cache else args.model_cache
+    
+    # Geen video: alleen de detecties, als sidecar naast het gevraagde output pad
+    encoder = None
+    if args.encoder == "none":
+        if args.output and not args.results:
+            args.results = str(Path(args.output).with_suffix(".jsonl"))
+            print(f"🎞️  --encoder none: geen video, detecties naar {args.results}")
+        args.output = None
+        # Ook geen preview venster: dan hoeft er niets getekend te worden
+        args.headless = True
+        # De store vult alleen process_video; een map met afbeeldingen schrijft altijd een .jsonl
+        stored = args.store and not is_live_source(args.input)
+        if args.input and not (args.results or stored or is_batch_input(args.input)):
+            print("❌ --encoder none schrijft geen video: geef --output, --results of --store op "
+                  "om de detecties te bewaren")
+            return
+    else:
+        encoder = VideoEncoder(args.encoder, codec=args.codec, preset=args.preset, threads=args.encode_threads)
+    
+    # Eenmalige ONNX export, uit de lokale model cache
+    if args.export_onnx:
+        if not TRANSFORMERS_AVAILABLE:
+            print("❌ Voor de export zijn torch en transformers nodig: pip install transformers torch onnx")
+            return
+        load_transformers()
+        model_name = "facebook/detr-resnet-50"
+        processor, model = SimpleObjectDetector._load_pretrained(model_name, cache_dir)
+        export_onnx(processor, model, args.onnx_model, model_name)
+        return
+    
     # Check if input is provided when not creating sample
-    if not args.input:
+    if not args.input and not args.profile_startup:
         print("❌ --input is verplicht wanneer --create-sample niet wordt gebruikt")
         parser.print_help()
         return
     
-    # Check of transformers beschikbaar is
-    if not TRANSFORMERS_AVAILABLE:
+    # Live bronnen slaan zelf frames over (altijd het nieuwste frame), daar is niets adaptiefs aan te kiezen
+    if args.adaptive and is_live_source(args.input):
+        print("❌ --adaptive werkt alleen voor video bestanden; gebruik --target-fps om live detectie te begrenzen")
+        return
+    
+    # Check of transformers beschikbaar is (alleen DETR heeft het nodig)
+    if args.backend.startswith("detr") and not TRANSFORMERS_AVAILABLE:
         print("❌ Installeer eerst de benodigde packages:")
         print("   pip install transformers torch torchvision opencv-python pillow matplotlib")
         return
     
+    detector_kwargs = dict(backend=args.backend, confidence_threshold=args.confidence, cache_dir=cache_dir,
+                           quantize=args.cpu_optimized, num_threads=args.threads,
+                           num_interop_threads=args.interop_threads,
+                           result_cache=args.result_cache, result_cache_size=args.result_cache_size,
+                           tile_size=args.tile_size, tile_overlap=args.tile_overlap, roi=args.roi,
+                           cascade=args.cascade, cascade_below=args.cascade_below,
+                           cascade_keyframes=args.cascade_keyframes,
+                           cascade_labels=args.cascade_labels.split(",") if args.cascade_labels else None)
+    if args.backend.startswith("onnx"):
+        detector_kwargs["onnx_model"] = args.onnx_model
+    video_kwargs = dict(batch_size=args.batch_size, pipeline=args.pipeline, adaptive=args.adaptive,
+                        target_fps=args.target_fps, track=args.track, scene_threshold=args.scene_threshold,
+                        stats_interval=args.stats_interval, encoder=encoder)
+    
+    # Video over meerdere processen: elk proces laadt zijn eigen detector
+    if args.workers and args.workers > 1 and args.input and Path(args.input).suffix.lower() in ['.mp4', '.avi', '.mov', '.mkv']:
+        if args.threads is None:
+            detector_kwargs["num_threads"] = threads_per_worker(args.workers)
+        model_name = "facebook/detr-resnet-50"
+        if (args.backend.startswith("detr") and cache_dir
+                and not (Path(cache_dir) / model_name.replace("/", "--") / "config.json").exists()):
+            # Eén keer downloaden en cachen, zodat de workers niet tegelijk de hub op gaan
+            load_transformers()
+            SimpleObjectDetector._load_pretrained(model_name, cache_dir)
+        segment_fn = partial(process_video_segment, detector_kwargs=detector_kwargs, video_kwargs=video_kwargs)
+        # De segmenten schrijven JSON Lines; de store wordt daarna in één keer gevuld
+        results_path = args.results
+        if args.store and not results_path:
+            results_path = str(Path(tempfile.mkdtemp(prefix="video_store_")) / "detections.jsonl")
+        stats = process_video_sharded(args.input, segment_fn, args.output, results_path, args.workers)
+        print_detection_stats(stats)
+        if args.store:
+            fps, width, height = probe_video(args.input)
+            with DetectionStore(args.store) as store:
+                count = store.import_jsonl(args.input, results_path, fps, width, height,
+                                           model=stats.model or args.backend)
+                print(f"🗃️  {count} detecties opgeslagen: {store.describe()}")
+            if not args.results:
+                shutil.rmtree(Path(results_path).parent, ignore_errors=True)
+        return
+    
     # Detector initialiseren
     try:
-        detector = SimpleObjectDetector(confidence_threshold=args.confidence)
+        detector = build_detector(**detector_kwargs)
     except Exception as e:
         print(f"❌ Fout bij initialiseren detector: {e}")
         return
+    if not detector.available:
+        backends = f"{args.cascade}' of '{args.backend}" if args.cascade else args.backend
+        print(f"❌ Backend '{backends}' is niet beschikbaar (package of modelbestanden ontbreken)")
+        return
+    
+    if args.profile_startup:
+        print_startup_profile()
+        if not args.input:
+            return
     
     # Input verwerken
-    if args.input.lower() == "webcam":
-        process_webcam(detector)
+    if is_live_source(args.input):
+        process_webcam(detector, source=args.input, target_fps=args.target_fps,
+                       scene_threshold=args.scene_threshold, output_path=args.output,
+                       results_path=args.results, headless=args.headless, encoder=encoder)
+    elif is_batch_input(args.input):
+        process_image_batch(args.input, detector, args.results or "detections.jsonl",
+                            batch_size=args.batch_size, decode_threads=args.decode_threads,
+                            resume=args.resume)
     elif Path(args.input).suffix.lower() in ['.jpg', '.jpeg', '.png', '.bmp']:
-        process_image(args.input, detector, args.save_image)
+        process_image(args.input, detector, args.save_image, show=not args.headless)
     elif Path(args.input).suffix.lower() in ['.mp4', '.avi', '.mov', '.mkv']:
-        process_video(args.input, detector, args.output)
+        process_video(args.input, detector, args.output, headless=args.headless,
+                      results_path=args.results, store_path=args.store, **video_kwargs)
     else:
         print(f"❌ Onbekend input formaat: {args.input}")
-        print("   Ondersteunde formaten: webcam, jpg/png (afbeeldingen), mp4/avi (video's)")
+        print("   Ondersteunde formaten: webcam, jpg/png (afbeeldingen), map of glob met afbeeldingen, mp4/avi (video's)")
+        return
+    
+    if isinstance(detector, CascadeDetector):
+        print(f"🪜 Cascade: {detector.describe()}")
+    if detector.result_cache is not None:
+        print(f"🗄️  Detectie cache: {detector.result_cache.describe()}")
 
 if __name__ == "__main__":
     print("🤖 Object Detection Demo")
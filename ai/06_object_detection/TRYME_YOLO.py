@@ -4,6 +4,8 @@ YOLO Object Detection - Better for Chairs
 =========================================
 
 Alternative script using YOLOv5 which is often better at detecting furniture.
+YOLOv5Detector implements the common Detector interface (detectors.py), so
+the full TRYME.py pipeline can use it too: python TRYME.py --backend yolov5 ...
 """
 
 import cv2
@@ -11,6 +13,15 @@ import torch
 import numpy as np
 from pathlib import Path
 import argparse
+from functools import partial
+
+from detection_renderer import DetectionRenderer
+from detection_results import Detections, JsonlResultsWriter
+from detection_stats import DetectionStats, format_snapshot
+from detectors import Detector
+from tracker import IoUTracker
+from video_shards import process_video_sharded
+from video_writers import ENCODERS, VideoEncoder
 
 # Try to import YOLOv5
 try:
@@ -20,17 +31,52 @@ except ImportError:
     YOLO_AVAILABLE = False
     print("⚠️  YOLOv5 not available. Install with: pip install yolov5")
 
-def detect_with_yolo(video_path, output_path, confidence=0.5):
-    """Use YOLOv5 for object detection"""
+class YOLOv5Detector(Detector):
+    """YOLOv5 behind the common detector interface: BGR frames in, Detections out"""
+    
+    def __init__(self, weights="yolov5s.pt", confidence_threshold=0.5):
+        self.name = Path(weights).stem
+        self.confidence_threshold = confidence_threshold
+        self.model = None
+        if YOLO_AVAILABLE:
+            print("🔄 Loading YOLOv5 model...")
+            self.model = yolov5.load(weights)
+            print("✅ YOLOv5 model loaded")
+    
+    @property
+    def available(self):
+        return self.model is not None
+    
+    def _detect_bgr(self, frames, batch_size):
+        if self.model is None:
+            return [Detections.empty() for _ in frames]
+        
+        self.model.conf = self.confidence_threshold
+        detections = []
+        for start in range(0, len(frames), batch_size):
+            # AutoShape expects RGB arrays; a list is one batched forward pass
+            batch = [cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) for frame in frames[start:start + batch_size]]
+            for rows in self.model(batch).xyxy:
+                # Rows are [x1, y1, x2, y2, confidence, class]
+                rows = rows.cpu().numpy()
+                rows = rows[rows[:, 4] > self.confidence_threshold]
+                detections.append(Detections(rows[:, :4], rows[:, 4], rows[:, 5], self.model.names))
+        return detections
+
+def detect_with_yolo(video_path, output_path=None, confidence=0.5, results_path=None, track=False,
+                     start_frame=0, end_frame=None, stats_interval=30, encoder=None):
+    """Use YOLOv5 for object detection (headless: never opens a window), returns the detection stats
+    
+    start_frame/end_frame restrict processing to frames [start_frame, end_frame).
+    stats_interval prints a snapshot of the running statistics every so many seconds.
+    encoder is the VideoEncoder for output_path (default: OpenCV mp4v).
+    """
     if not YOLO_AVAILABLE:
         print("❌ YOLOv5 not installed")
-        return
+        return DetectionStats()
     
     # Load YOLOv5 model
-    print("🔄 Loading YOLOv5 model...")
-    model = yolov5.load('yolov5s.pt')
-    model.conf = confidence  # confidence threshold
-    print("✅ YOLOv5 model loaded")
+    detector = YOLOv5Detector(confidence_threshold=confidence)
     
     # Open video
     cap = cv2.VideoCapture(str(video_path))
@@ -41,71 +87,131 @@ def detect_with_yolo(video_path, output_path, confidence=0.5):
     
     print(f"📊 Video: {width}x{height}, {fps} FPS, {total_frames} frames")
     
-    # Output writer
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-    writer = cv2.VideoWriter(str(output_path), fourcc, fps, (width, height))
+    # Only part of the video (one segment with --workers)
+    if start_frame:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+    if end_frame is None:
+        end_frame = total_frames if total_frames > 0 else float("inf")
+    segment_frames = max(1, min(end_frame, total_frames or 1) - start_frame)
+    
+    # Output writer (optional, the results file is often enough)
+    writer = None
+    if output_path:
+        writer = (encoder or VideoEncoder()).open(output_path, width, height, fps)
+    
+    # Per-frame detections as JSON Lines
+    results_writer = JsonlResultsWriter(results_path, fps) if results_path else None
+    
+    # Optional tracker: boxes on skipped frames and per-object counts
+    tracker = IoUTracker() if track else None
     
-    frame_count = 0
-    detection_stats = {}
+    # Boxes and cached label sprites, drawn straight into the BGR frame
+    renderer = DetectionRenderer(color=(0, 255, 0), thickness=2)
+    
+    frame_count = start_frame
+    detection_stats = DetectionStats(snapshot_interval=stats_interval)
     
     try:
-        while True:
+        while frame_count < end_frame:
             ret, frame = cap.read()
             if not ret:
                 break
             
             # Progress
             if frame_count % 30 == 0:
-                progress = (frame_count / total_frames) * 100
+                progress = ((frame_count - start_frame) / segment_frames) * 100
                 print(f"🔄 Progress: {progress:.1f}%")
             
             # YOLO detection every 3rd frame
-            if frame_count % 3 == 0:
-                results = model(frame)
+            frame_detections = None
+            is_keyframe = frame_count % 3 == 0
+            if is_keyframe:
+                frame_detections = detector.detect_objects(frame)
+                
+                new_tracks = []
+                if tracker:
+                    frame_detections, new_tracks = tracker.update(frame_count, frame_detections)
+                
+                # Statistics (streaming, constant memory per label)
+                detection_stats.update(frame_detections, new_tracks)
+                snapshot = detection_stats.periodic_snapshot()
+                if snapshot is not None:
+                    print(f"📊 Snapshot (frame {frame_count}): {format_snapshot(snapshot)}")
+            elif tracker:
+                # Skipped frame: carry the tracked boxes forward
+                frame_detections = tracker.predict(frame_count)
+            
+            if frame_detections is not None:
+                # Draw on frame (only needed for the output video)
+                if writer:
+                    renderer.draw(frame, frame_detections)
                 
-                # Process results
-                for *box, conf, cls in results.xyxy[0].cpu().numpy():
-                    if conf > confidence:
-                        x1, y1, x2, y2 = map(int, box)
-                        label = model.names[int(cls)]
-                        
-                        # Statistics
-                        if label not in detection_stats:
-                            detection_stats[label] = {"count": 0, "confidences": []}
-                        detection_stats[label]["count"] += 1
-                        detection_stats[label]["confidences"].append(conf)
-                        
-                        # Draw on frame
-                        cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                        cv2.putText(frame, f"{label}: {conf:.2f}", 
-                                   (x1, max(30, y1 - 10)), 
-                                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+                if results_writer:
+                    results_writer.write(frame_count, frame_detections, keyframe=is_keyframe)
             
-            writer.write(frame)
+            if writer:
+                writer.write(frame)
             frame_count += 1
             
     finally:
         cap.release()
-        writer.release()
-        cv2.destroyAllWindows()
+        if writer:
+            writer.release()
+        if results_writer:
+            results_writer.close()
     
-    # Print statistics
+    print_yolo_stats(detection_stats)
+    return detection_stats
+
+def _yolo_segment(video_path, start_frame, end_frame, output_path, results_path, confidence, track,
+                  stats_interval, encoder):
+    """One segment of a --workers run, executed in its own process with its own model"""
+    return detect_with_yolo(video_path, output_path, confidence, results_path, track,
+                            start_frame=start_frame, end_frame=end_frame, stats_interval=stats_interval,
+                            encoder=encoder)
+
+def print_yolo_stats(detection_stats):
+    """Print a summary of the detection statistics"""
     print(f"\n📈 YOLO Detection Statistics:")
-    for label, stats in sorted(detection_stats.items(), key=lambda x: x[1]["count"], reverse=True):
-        count = stats["count"]
-        confidences = stats["confidences"]
-        if confidences:
-            avg_conf = sum(confidences) / len(confidences)
-            min_conf = min(confidences)
-            max_conf = max(confidences)
-            print(f"  {label}: {count} detections (avg: {avg_conf:.3f}, min: {min_conf:.3f}, max: {max_conf:.3f})")
+    for label, stats in detection_stats.items():
+        objects = f"{stats.objects} objects, " if stats.objects else ""
+        print(f"  {label}: {objects}{stats.count} detections (avg: {stats.mean:.3f}, std: {stats.std:.3f}, "
+              f"min: {stats.min:.3f}, p50: {stats.quantile(0.5):.3f}, max: {stats.max:.3f})")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="YOLO Object Detection")
     parser.add_argument("--input", required=True, help="Input video path")
-    parser.add_argument("--output", required=True, help="Output video path")
+    parser.add_argument("--output", help="Output video path (optional)")
+    parser.add_argument("--results", help="Write per-frame detections to a JSON Lines file")
+    parser.add_argument("--encoder", choices=ENCODERS, default="opencv",
+                        help="How --output is written: opencv (mp4v), ffmpeg (separate process) or "
+                             "none (no video, only a .jsonl sidecar next to --output)")
+    parser.add_argument("--codec", default="libx264", help="ffmpeg codec, e.g. libx264 or h264_nvenc")
+    parser.add_argument("--preset", help="Codec preset (default: veryfast for libx264/libx265)")
+    parser.add_argument("--encode-threads", type=int, help="ffmpeg encoder threads (default: ffmpeg decides)")
     parser.add_argument("--confidence", type=float, default=0.5, help="Confidence threshold")
+    parser.add_argument("--track", action="store_true", help="Track objects between detected frames")
+    parser.add_argument("--workers", type=int, help="Split the video into N segments, each in its own process")
+    parser.add_argument("--stats-interval", type=float, default=30,
+                        help="Seconds between snapshots of the running statistics (default: 30)")
     
     args = parser.parse_args()
     
-    detect_with_yolo(args.input, args.output, args.confidence)
\ No newline at end of file
+    if not args.output and not args.results:
+        parser.error("give --output and/or --results")
+    
+    # No video at all: only the detections, as a sidecar next to the requested output
+    encoder = None
+    if args.encoder == "none":
+        args.results = args.results or str(Path(args.output).with_suffix(".jsonl"))
+        args.output = None
+    else:
+        encoder = VideoEncoder(args.encoder, codec=args.codec, preset=args.preset, threads=args.encode_threads)
+    
+    if args.workers and args.workers > 1:
+        segment_fn = partial(_yolo_segment, confidence=args.confidence, track=args.track,
+                             stats_interval=args.stats_interval, encoder=encoder)
+        print_yolo_stats(process_video_sharded(args.input, segment_fn, args.output, args.results, args.workers))
+    else:
+        detect_with_yolo(args.input, args.output, args.confidence, args.results, args.track,
+                         stats_interval=args.stats_interval, encoder=encoder)
\ No newline at end of file
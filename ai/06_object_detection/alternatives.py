@@ -10,11 +10,15 @@ giving students lighter alternatives for different use cases.
 import cv2
 import numpy as np
 from pathlib import Path
-import time
 
-class OpenCVObjectDetector:
+from detection_results import Detections
+from detectors import Detector
+
+class OpenCVObjectDetector(Detector):
     """Lightweight object detection using OpenCV DNN module"""
     
+    name = "opencv-yolov4"
+    
     def __init__(self):
         """Initialize with pre-trained COCO model"""
         self.net = None
@@ -75,10 +79,17 @@ class OpenCVObjectDetector:
         print("✅ YOLO model files downloaded")
         self.load_yolo_model()
     
-    def detect_objects(self, image):
-        """Detect objects in image using OpenCV DNN"""
+    @property
+    def available(self):
+        return self.net is not None
+    
+    def _detect_bgr(self, frames, batch_size):
+        return [self._detect_one(frame) for frame in frames]
+    
+    def _detect_one(self, image):
+        """Detect objects in one BGR image using OpenCV DNN"""
         if self.net is None:
-            return []
+            return Detections.empty(self.classes)
         
         height, width = image.shape[:2]
         
@@ -91,51 +102,56 @@ class OpenCVObjectDetector:
         # Run forward pass
         layer_outputs = self.net.forward(self.net.getUnconnectedOutLayersNames())
         
-        # Process outputs
-        boxes = []
-        confidences = []
-        class_ids = []
+        # Process outputs: all layers at once instead of row by row
+        boxes, confidences, class_ids = self.decode_outputs(layer_outputs, width, height)
         
-        for output in layer_outputs:
-            for detection in output:
-                scores = detection[5:]
-                class_id = np.argmax(scores)
-                confidence = scores[class_id]
-                
-                if confidence > self.confidence_threshold:
-                    # Scale back to original image
-                    center_x = int(detection[0] * width)
-                    center_y = int(detection[1] * height)
-                    w = int(detection[2] * width)
-                    h = int(detection[3] * height)
-                    
-                    x = int(center_x - w/2)
-                    y = int(center_y - h/2)
-                    
-                    boxes.append([x, y, w, h])
-                    confidences.append(float(confidence))
-                    class_ids.append(class_id)
+        if len(boxes) == 0:
+            return Detections.empty(self.classes)
         
-        # Apply non-maximum suppression
-        indices = cv2.dnn.NMSBoxes(boxes, confidences, self.confidence_threshold, self.nms_threshold)
+        # Apply non-maximum suppression (only on the filtered candidates)
+        indices = cv2.dnn.NMSBoxes(boxes.tolist(), confidences.tolist(), self.confidence_threshold, self.nms_threshold)
+        keep = np.asarray(indices, dtype=int).reshape(-1)
         
-        detections = []
-        if len(indices) > 0:
-            for i in indices.flatten():
-                x, y, w, h = boxes[i]
-                detections.append({
-                    "label": self.classes[class_ids[i]],
-                    "confidence": confidences[i],
-                    "box": [x, y, x + w, y + h]
-                })
+        # [x, y, w, h] -> [x1, y1, x2, y2]
+        boxes = boxes[keep]
+        boxes[:, 2:] += boxes[:, :2]
+        return Detections(boxes, confidences[keep], class_ids[keep], self.classes)
+    
+    def decode_outputs(self, layer_outputs, width, height):
+        """
+        Decode raw YOLO output rows [cx, cy, w, h, objectness, class scores...]
+        with whole-array NumPy operations.
         
-        return detections
+        Returns boxes as [x, y, w, h] in pixels, confidences and class ids,
+        only for rows above the confidence threshold.
+        """
+        rows = np.concatenate([output.reshape(-1, output.shape[-1]) for output in layer_outputs])
+        scores = rows[:, 5:]
+        
+        class_ids = scores.argmax(axis=1)
+        confidences = scores[np.arange(len(rows)), class_ids]
+        keep = confidences > self.confidence_threshold
+        
+        rows, class_ids, confidences = rows[keep], class_ids[keep], confidences[keep]
+        
+        # Scale back to original image
+        center_x = (rows[:, 0] * width).astype(int)
+        center_y = (rows[:, 1] * height).astype(int)
+        w = (rows[:, 2] * width).astype(int)
+        h = (rows[:, 3] * height).astype(int)
+        
+        x = (center_x - w / 2).astype(int)
+        y = (center_y - h / 2).astype(int)
+        
+        boxes = np.stack([x, y, w, h], axis=1)
+        return boxes, confidences.astype(float), class_ids
 
-class UltralyticsDetector:
+class UltralyticsDetector(Detector):
     """Simple YOLO detection using Ultralytics"""
     
     def __init__(self, model_name="yolov8n.pt"):
         """Initialize with Ultralytics YOLO model"""
+        self.name = f"ultralytics-{Path(model_name).stem}"
         try:
             from ultralytics import YOLO
             self.model = YOLO(model_name)
@@ -144,37 +160,36 @@ class UltralyticsDetector:
             print("❌ Ultralytics not installed. Run: pip install ultralytics")
             self.model = None
     
-    def detect_objects(self, image):
-        """Detect objects using Ultralytics YOLO"""
+    @property
+    def available(self):
+        return self.model is not None
+    
+    def _detect_bgr(self, frames, batch_size):
+        """Detect objects using Ultralytics YOLO (takes BGR arrays, batch_size frames per call)"""
         if self.model is None:
-            return []
-        
-        # Run inference
-        results = self.model(image)
+            return [Detections.empty() for _ in frames]
         
         detections = []
-        for result in results:
-            boxes = result.boxes
-            if boxes is not None:
-                for box in boxes:
-                    # Get box coordinates
-                    x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                    
-                    # Get confidence and class
-                    confidence = box.conf[0].cpu().numpy()
-                    class_id = int(box.cls[0].cpu().numpy())
-                    
-                    detections.append({
-                        "label": self.model.names[class_id],
-                        "confidence": float(confidence),
-                        "box": [int(x1), int(y1), int(x2), int(y2)]
-                    })
+        for start in range(0, len(frames), batch_size):
+            # Run inference on the whole batch
+            results = self.model(frames[start:start + batch_size], conf=self.confidence_threshold, verbose=False)
+            
+            for result in results:
+                boxes = result.boxes
+                if boxes is None:
+                    detections.append(Detections.empty(self.model.names))
+                    continue
+                # Whole-tensor copies instead of one .cpu() call per box
+                detections.append(Detections(boxes.xyxy.cpu().numpy(), boxes.conf.cpu().numpy(),
+                                             boxes.cls.cpu().numpy(), self.model.names))
         
         return detections
 
-class TensorFlowDetector:
+class TensorFlowDetector(Detector):
     """TensorFlow object detection implementation"""
     
+    name = "tf-ssd_mobilenet_v2"
+    
     def __init__(self):
         """Initialize TensorFlow detector"""
         try:
@@ -206,15 +221,22 @@ class TensorFlowDetector:
             print("❌ TensorFlow not installed. Run: pip install tensorflow tensorflow-hub")
             self.model = None
     
-    def detect_objects(self, image):
-        """Detect objects using TensorFlow"""
+    @property
+    def available(self):
+        return self.model is not None
+    
+    def _detect_bgr(self, frames, batch_size):
+        return [self._detect_one(frame) for frame in frames]
+    
+    def _detect_one(self, image):
+        """Detect objects in one BGR image using TensorFlow"""
         if self.model is None:
-            return []
+            return Detections.empty()
         
         import tensorflow as tf
         
-        # Prepare image
-        input_tensor = tf.convert_to_tensor(image)
+        # Prepare image (the hub model expects RGB)
+        input_tensor = tf.convert_to_tensor(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
         input_tensor = input_tensor[tf.newaxis, ...]
         
         # Run inference
@@ -226,26 +248,18 @@ class TensorFlowDetector:
         detection_scores = detections['detection_scores'][0].numpy()
         
         height, width = image.shape[:2]
-        results = []
         
-        for i in range(len(detection_scores)):
-            if detection_scores[i] > 0.5:  # Confidence threshold
-                # Convert normalized coordinates to pixel coordinates
-                y1, x1, y2, x2 = detection_boxes[i]
-                x1, y1, x2, y2 = int(x1 * width), int(y1 * height), int(x2 * width), int(y2 * height)
-                
-                class_id = detection_classes[i]
-                if class_id < len(self.class_names):
-                    results.append({
-                        "label": self.class_names[class_id],
-                        "confidence": float(detection_scores[i]),
-                        "box": [x1, y1, x2, y2]
-                    })
+        # Confidence threshold and known classes, for all detections at once
+        keep = (detection_scores > self.confidence_threshold) & (detection_classes < len(self.class_names))
         
-        return results
+        # Convert normalized [y1, x1, y2, x2] to pixel [x1, y1, x2, y2]
+        boxes = detection_boxes[keep][:, [1, 0, 3, 2]] * [width, height, width, height]
+        return Detections(boxes, detection_scores[keep], detection_classes[keep], self.class_names)
 
-def benchmark_detectors(image_path):
-    """Compare performance of different detectors"""
+def benchmark_detectors(image_path, warmup=1, repeats=5):
+    """Compare performance of different detectors (quick demo, see benchmark.py for the full suite)"""
+    from benchmark import measure_latencies
+    
     print("🏁 Benchmarking different object detection approaches...")
     
     # Load test image
@@ -266,9 +280,10 @@ def benchmark_detectors(image_path):
         print(f"\n🔄 Testing {name}...")
         
         try:
-            start_time = time.time()
+            # Warm-up first so lazy initialization is not measured, then take the median
+            latencies, _ = measure_latencies(detector.detect_objects, [image], warmup, repeats)
+            inference_time = float(np.median(latencies))
             detections = detector.detect_objects(image)
-            inference_time = time.time() - start_time
             
             results[name] = {
                 "inference_time": inference_time,
@@ -290,7 +305,7 @@ def benchmark_detectors(image_path):
     
     # Summary
     print(f"\n📊 Benchmark Summary:")
-    print(f"{'Method':<20} {'Time (s)':<10} {'Detections':<12} {'Status'}")
+    print(f"{'Method':<20} {'p50 (s)':<10} {'Detections':<12} {'Status'}")
     print("-" * 50)
     
     for name, result in results.items():
@@ -322,6 +337,7 @@ def main():
     print("• Ultralytics: Easiest setup, great for beginners") 
     print("• TensorFlow: Good for production, ecosystem support")
     print("• PyTorch + Transformers: Best for research, latest models")
+    print("\n📏 For p50/p95/p99, throughput and memory over many images: python benchmark.py --help")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Object Detection Benchmark
+==========================
+
+Steady-state benchmark for the detectors in this folder. Unlike the quick
+`benchmark_detectors` demo in alternatives.py this does warm-up iterations
+first, then N timed repetitions over a directory of images at several
+resolutions, and reports p50/p95/p99 latency, images/sec and peak RSS.
+Every detector runs in its own process, so the memory numbers are comparable.
+
+Results are written as CSV and JSON so runs can be compared across commits.
+Everything runs offline: use --generate to create test images with
+create_chair_video.py.
+
+With --baseline every detector's output is also compared to the baseline
+detector on the same images (recall, precision, mean IoU), e.g. to see what
+int8 quantization costs in accuracy.
+
+Usage:
+    python benchmark.py --generate --images bench_images
+    python benchmark.py --images bench_images --detectors opencv,detr --output bench_results
+    python benchmark.py --images bench_images --detectors detr,detr-int8 --baseline detr --threads 4
+    python benchmark.py --images bench_images --detectors detr,onnx,onnx-opencv --baseline detr
+    python benchmark.py --drawing
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import json
+import multiprocessing
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from detectors import BACKENDS
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp"}
+DEFAULT_RESOLUTIONS = "320x240,640x480,1280x720"
+
+
+def create_detector(name, num_threads=None, num_interop_threads=None):
+    """Create a detector by short name (see detectors.BACKENDS); frameworks are imported lazily"""
+    from detectors import create_detector as create_backend
+    return create_backend(name, num_threads=num_threads, num_interop_threads=num_interop_threads)
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process in MB (None if unknown).
+
+    The peak only ever goes up, which is why every detector is benchmarked in
+    its own process (see run_benchmark).
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def parse_resolutions(text):
+    """'320x240,640x480' -> [(320, 240), (640, 480)]"""
+    resolutions = []
+    for part in text.split(","):
+        width, height = part.lower().split("x")
+        resolutions.append((int(width), int(height)))
+    return resolutions
+
+
+def load_images(image_dir):
+    """Load all images in a directory as BGR arrays"""
+    paths = sorted(p for p in Path(image_dir).iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+    images = [cv2.imread(str(p)) for p in paths]
+    return [image for image in images if image is not None]
+
+
+def generate_images(image_dir, count=8):
+    """Write synthetic chair images with create_chair_video.py (no network needed)"""
+    from create_chair_video import (create_chair_frame, create_enhanced_chair_image,
+                                    create_photorealistic_chair_image)
+
+    image_dir = Path(image_dir)
+    image_dir.mkdir(parents=True, exist_ok=True)
+
+    create_photorealistic_chair_image().save(image_dir / "chair_photorealistic.png")
+    create_enhanced_chair_image().save(image_dir / "chair_enhanced.png")
+    for i in range(max(0, count - 2)):
+        create_chair_frame(i, count).save(image_dir / f"chair_frame_{i:03d}.png")
+
+    print(f"🎨 Generated {count} test images in {image_dir}")
+
+
+def measure_latencies(detect, images, warmup=3, repeats=10):
+    """
+    Time detect(image) for every image, after `warmup` untimed passes.
+
+    Returns:
+        (latencies in seconds, detections per image from the last pass)
+    """
+    for _ in range(warmup):
+        for image in images:
+            detect(image)
+
+    latencies = []
+    outputs = []
+    for _ in range(repeats):
+        outputs = []
+        for image in images:
+            start = time.perf_counter()
+            outputs.append(detect(image))
+            latencies.append(time.perf_counter() - start)
+    return latencies, outputs
+
+
+def compare_detections(baseline_outputs, outputs, iou_threshold=0.5):
+    """
+    Accuracy of `outputs` relative to `baseline_outputs` (same images, same order).
+
+    A detection matches a baseline detection of the same label with IoU >= iou_threshold.
+    """
+    from tracker import iou_matrix
+
+    matched = 0
+    total_baseline = 0
+    total_candidate = 0
+    matched_ious = []
+    confidence_deltas = []
+
+    for baseline, candidate in zip(baseline_outputs, outputs):
+        total_baseline += len(baseline)
+        total_candidate += len(candidate)
+        if not baseline or not candidate:
+            continue
+
+        ious = iou_matrix([d["box"] for d in baseline], [d["box"] for d in candidate])
+        used = set()
+        for b, detection in enumerate(baseline):
+            # Best unused candidate with the same label
+            order = np.argsort(ious[b])[::-1]
+            for c in order:
+                if ious[b, c] < iou_threshold:
+                    break
+                if c in used or candidate[c]["label"] != detection["label"]:
+                    continue
+                used.add(c)
+                matched += 1
+                matched_ious.append(float(ious[b, c]))
+                confidence_deltas.append(candidate[c]["confidence"] - detection["confidence"])
+                break
+
+    return {
+        "recall_vs_baseline": matched / total_baseline if total_baseline else 1.0,
+        "precision_vs_baseline": matched / total_candidate if total_candidate else 1.0,
+        "mean_iou_vs_baseline": float(np.mean(matched_ious)) if matched_ious else None,
+        "confidence_delta": float(np.mean(confidence_deltas)) if confidence_deltas else None,
+    }
+
+
+def summarize(latencies, images_per_pass):
+    """Latency percentiles in ms plus throughput"""
+    latencies = np.asarray(latencies)
+    total = latencies.sum()
+    return {
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p95_ms": float(np.percentile(latencies, 95) * 1000),
+        "p99_ms": float(np.percentile(latencies, 99) * 1000),
+        "mean_ms": float(latencies.mean() * 1000),
+        "images_per_sec": float(len(latencies) / total) if total > 0 else 0.0,
+        "images": images_per_pass,
+    }
+
+
+def benchmark_detector(name, images, resolutions, warmup=3, repeats=10, num_threads=None,
+                       num_interop_threads=None):
+    """
+    Benchmark one detector at every resolution; runs in its own process.
+
+    Returns:
+        (result rows, detections per image for each resolution)
+    """
+    rows = []
+    outputs_per_resolution = {}
+    # What the process uses before the model: interpreter, numpy/OpenCV and the test images
+    rss_before_load = peak_rss_mb()
+    try:
+        load_start = time.perf_counter()
+        detector = create_detector(name, num_threads, num_interop_threads)
+        load_time = time.perf_counter() - load_start
+    except Exception as e:
+        print(f"   ❌ Error: {e}")
+        return [{"detector": name, "status": f"error: {e}"}], outputs_per_resolution
+
+    if not detector.available:
+        print("   ⚠️  Not available, skipped")
+        return [{"detector": name, "status": "unavailable"}], outputs_per_resolution
+
+    for width, height in resolutions:
+        resized = [cv2.resize(image, (width, height)) for image in images]
+        try:
+            latencies, outputs = measure_latencies(detector.detect_objects, resized, warmup, repeats)
+        except Exception as e:
+            print(f"   ❌ {width}x{height}: {e}")
+            rows.append({"detector": name, "resolution": f"{width}x{height}", "status": f"error: {e}"})
+            continue
+
+        peak = peak_rss_mb()
+        rows.append({
+            "detector": name,
+            "resolution": f"{width}x{height}",
+            "status": "ok",
+            "load_s": round(load_time, 3),
+            "warmup": warmup,
+            "repeats": repeats,
+            **summarize(latencies, len(resized)),
+            "detections_per_image": sum(len(o) for o in outputs) / len(resized),
+            "peak_rss_mb": peak,
+            # Growth of the peak from loading the model on: the detector's own footprint
+            "model_rss_mb": peak - rss_before_load if peak is not None else None,
+        })
+        outputs_per_resolution[(width, height)] = outputs
+    return rows, outputs_per_resolution
+
+
+def run_benchmark(images, detector_names, resolutions, warmup=3, repeats=10, baseline=None,
+                  num_threads=None, num_interop_threads=None):
+    """
+    Benchmark every detector at every resolution, returns a list of result rows.
+
+    Each detector runs in a fresh (spawned) process, so its peak RSS is not
+    inflated by detectors that were loaded before it.
+    """
+    rows = []
+    # Outputs of the baseline detector per resolution, for the accuracy comparison
+    baseline_outputs = {}
+
+    # Run the baseline first so the others can be compared against it
+    if baseline:
+        detector_names = [baseline] + [name for name in detector_names if name != baseline]
+
+    context = multiprocessing.get_context("spawn")
+    for name in detector_names:
+        print(f"\n🔄 {name}")
+        try:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                detector_rows, outputs = pool.submit(benchmark_detector, name, images, resolutions, warmup,
+                                                     repeats, num_threads, num_interop_threads).result()
+        except Exception as e:  # e.g. the process crashed (out of memory)
+            print(f"   ❌ Error: {e}")
+            rows.append({"detector": name, "status": f"error: {e}"})
+            continue
+
+        for row in detector_rows:
+            if row.get("status") != "ok":
+                rows.append(row)
+                continue
+            resolution = tuple(int(v) for v in row["resolution"].split("x"))
+            if name == baseline:
+                baseline_outputs[resolution] = outputs[resolution]
+            elif resolution in baseline_outputs:
+                row.update(compare_detections(baseline_outputs[resolution], outputs[resolution]))
+            rows.append(row)
+            print(f"   {row['resolution']}: p50 {row['p50_ms']:.1f} ms, p95 {row['p95_ms']:.1f} ms, "
+                  f"p99 {row['p99_ms']:.1f} ms, {row['images_per_sec']:.1f} img/s")
+            if "recall_vs_baseline" in row:
+                print(f"      vs {baseline}: recall {row['recall_vs_baseline']:.3f}, "
+                      f"precision {row['precision_vs_baseline']:.3f}")
+
+    return rows
+
+
+def git_commit():
+    """Current commit hash, so results can be compared across commits"""
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=Path(__file__).parent)
+        return result.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def write_results(rows, output_prefix):
+    """Write rows to <prefix>.csv and <prefix>.json (with run metadata)"""
+    output_prefix = Path(output_prefix)
+    output_prefix.parent.mkdir(parents=True, exist_ok=True)
+
+    metadata = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+    }
+
+    with open(output_prefix.with_suffix(".json"), "w") as f:
+        json.dump({"metadata": metadata, "results": rows}, f, indent=2)
+
+    fieldnames = []
+    for row in rows:
+        fieldnames.extend(key for key in row if key not in fieldnames)
+    with open(output_prefix.with_suffix(".csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["commit"] + fieldnames)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({"commit": metadata["commit"], **row})
+
+    print(f"\n💾 Results written to {output_prefix.with_suffix('.csv')} and {output_prefix.with_suffix('.json')}")
+
+
+def random_detections(count, width, height, rng):
+    """Random boxes with a handful of labels, like a crowded scene"""
+    labels = ["person", "chair", "car", "dining table", "bottle"]
+    detections = []
+    for i in range(count):
+        w, h = rng.integers(20, max(21, width // 4)), rng.integers(20, max(21, height // 4))
+        x1, y1 = rng.integers(0, width - w), rng.integers(0, height - h)
+        detection = {"label": labels[i % len(labels)], "confidence": float(rng.uniform(0.5, 1.0)),
+                     "box": np.array([x1, y1, x1 + w, y1 + h])}
+        if i % 2:
+            detection["track_id"] = i
+        detections.append(detection)
+    return detections
+
+
+def benchmark_drawing(resolutions, counts=(5, 50, 200), repeats=100, rounds=5):
+    """Micro-benchmark: per-detection cv2 drawing versus DetectionRenderer (best of `rounds`)"""
+    from detection_renderer import DetectionRenderer, draw_reference
+
+    rng = np.random.default_rng(0)
+    print(f"{'Resolution':<11} {'Boxes':<6} {'cv2 ms':<8} {'renderer ms':<12} {'speed-up'}")
+    print("-" * 48)
+    for width, height in resolutions:
+        frame = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        for count in counts:
+            detections = random_detections(count, width, height, rng)
+            renderer = DetectionRenderer()
+            timings = {}
+            for name, draw in (("cv2", draw_reference), ("renderer", renderer.draw)):
+                draw(frame, detections)  # warm-up (fills the sprite cache)
+                best = float("inf")
+                for _ in range(rounds):
+                    start = time.perf_counter()
+                    for _ in range(repeats):
+                        draw(frame, detections)
+                    best = min(best, (time.perf_counter() - start) / repeats)
+                timings[name] = best * 1000
+            print(f"{f'{width}x{height}':<11} {count:<6} {timings['cv2']:<8.3f} {timings['renderer']:<12.3f} "
+                  f"{timings['cv2'] / timings['renderer']:.2f}x")
+
+
+def print_summary(rows):
+    print("\n📊 Benchmark Summary:")
+    print(f"{'Detector':<12} {'Resolution':<11} {'p50 ms':<8} {'p95 ms':<8} {'p99 ms':<8} {'img/s':<7} "
+          f"{'RSS MB':<7} {'model MB'}")
+    print("-" * 73)
+    for row in rows:
+        if row.get("status") != "ok":
+            print(f"{row['detector']:<12} {row.get('resolution', '-'):<11} {row['status']}")
+            continue
+        rss = f"{row['peak_rss_mb']:.0f}" if row["peak_rss_mb"] is not None else "N/A"
+        model_rss = f"{row['model_rss_mb']:.0f}" if row["model_rss_mb"] is not None else "N/A"
+        print(f"{row['detector']:<12} {row['resolution']:<11} {row['p50_ms']:<8.1f} {row['p95_ms']:<8.1f} "
+              f"{row['p99_ms']:<8.1f} {row['images_per_sec']:<7.1f} {rss:<7} {model_rss}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Object detection benchmark")
+    parser.add_argument("--images", default="bench_images", help="Directory with test images")
+    parser.add_argument("--generate", action="store_true",
+                        help="Generate synthetic test images in --images first")
+    parser.add_argument("--detectors", default="opencv,detr",
+                        help=f"Comma separated, choose from: {', '.join(BACKENDS)}")
+    parser.add_argument("--resolutions", default=DEFAULT_RESOLUTIONS, help="Comma separated WIDTHxHEIGHT")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed passes before measuring")
+    parser.add_argument("--repeats", type=int, default=10, help="Timed passes over all images")
+    parser.add_argument("--output", default="bench_results", help="Output prefix for .csv/.json")
+    parser.add_argument("--baseline", help="Compare every detector's detections with this one (e.g. detr)")
+    parser.add_argument("--threads", type=int, help="Intra-op threads for the DETR and ONNX Runtime detectors")
+    parser.add_argument("--interop-threads", type=int, help="Torch inter-op threads for the DETR detectors")
+    parser.add_argument("--drawing", action="store_true",
+                        help="Only run the drawing micro-benchmark (cv2 per detection vs DetectionRenderer)")
+    args = parser.parse_args()
+
+    if args.drawing:
+        benchmark_drawing(parse_resolutions(args.resolutions))
+        return
+
+    if args.generate:
+        generate_images(args.images)
+
+    if not Path(args.images).is_dir():
+        print(f"❌ Image directory not found: {args.images} (use --generate)")
+        return
+
+    images = load_images(args.images)
+    if not images:
+        print(f"❌ No images in {args.images}")
+        return
+
+    detector_names = [name.strip() for name in args.detectors.split(",") if name.strip()]
+    print(f"🏁 Benchmarking {', '.join(detector_names)} on {len(images)} images, "
+          f"{args.warmup} warm-up + {args.repeats} timed passes")
+
+    rows = run_benchmark(images, detector_names, parse_resolutions(args.resolutions), args.warmup, args.repeats,
+                         baseline=args.baseline, num_threads=args.threads, num_interop_threads=args.interop_threads)
+    print_summary(rows)
+    write_results(rows, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Cascade detectie
+================
+
+Een snelle detector (bijv. OpenCV YOLO) bekijkt elk frame; het dure model
+(DETR) draait alleen op de frames die ertoe doen:
+
+- de snelle detector ziet een doelklasse (bijv. "chair")
+- de snelle detector twijfelt: een detectie onder escalate_below
+- elke keyframe_interval-de frame, zodat de snelle detector niets structureel mist
+
+Op de andere frames zijn de (zekere, niet-doel) detecties van de snelle
+detector het resultaat, met dezelfde confidence drempel als de dure detector. Zo krijg je DETR kwaliteit op de belangrijke frames
+voor een fractie van de rekentijd.
+
+    detector = CascadeDetector(create_detector("opencv"), detr, target_labels={"chair"})
+"""
+
+from collections import Counter
+
+from detectors import Detector
+
+
+class CascadeDetector(Detector):
+    """
+    Snelle detector als poortwachter voor een nauwkeurige detector.
+
+    Args:
+        cheap: snelle Detector die elk frame ziet; zijn confidence_threshold wordt
+               op hint_threshold gezet, zodat ook twijfelgevallen doorkomen
+        accurate: dure Detector voor de geëscaleerde frames
+        target_labels: labels die altijd naar de dure detector gaan (None = elke detectie)
+        escalate_below: detecties van de snelle detector onder deze confidence zijn twijfelgevallen
+        keyframe_interval: elke N-de frame altijd de dure detector (None of 0 = nooit)
+        hint_threshold: laagste confidence waarop de snelle detector iets meldt
+    """
+
+    def __init__(self, cheap, accurate, target_labels=None, escalate_below=0.6, keyframe_interval=30,
+                 hint_threshold=0.25):
+        self.cheap = cheap
+        self.accurate = accurate
+        self.target_labels = {label.lower() for label in target_labels} if target_labels else None
+        self.escalate_below = escalate_below
+        self.keyframe_interval = keyframe_interval
+        self.cheap.confidence_threshold = hint_threshold
+        self.name = f"cascade-{cheap.name}-{accurate.name}"
+        self.frames = 0
+        self.reasons = Counter()
+
+    @property
+    def confidence_threshold(self):
+        return self.accurate.confidence_threshold
+
+    @confidence_threshold.setter
+    def confidence_threshold(self, value):
+        self.accurate.confidence_threshold = value
+
+    @property
+    def available(self):
+        return self.cheap.available and self.accurate.available
+
+    # Welke frames geëscaleerd worden hangt af van de positie in de video
+    # (keyframes), dus geen cache op cascade niveau: beide detectors cachen zelf
+    @property
+    def result_cache(self):
+        return self.accurate.result_cache
+
+    def use_result_cache(self, result_cache, max_entries=10000):
+        self.cheap.use_result_cache(result_cache, max_entries)
+        self.accurate.use_result_cache(result_cache, max_entries)
+
+    def detect_frames(self, frames, batch_size=8):
+        return self._detect_bgr(frames, batch_size)
+
+    def escalation_reason(self, detections, frame_number):
+        """Waarom dit frame naar de dure detector moet, of None"""
+        if self.keyframe_interval and frame_number % self.keyframe_interval == 0:
+            return "keyframe"
+        if not len(detections):
+            return None
+        if self.target_labels is None:
+            return "detectie"
+        if any(label.lower() in self.target_labels for label in detections.labels):
+            return "doelklasse"
+        if (detections.scores < self.escalate_below).any():
+            return "onzeker"
+        return None
+
+    def _detect_bgr(self, frames, batch_size):
+        results = self.cheap.detect_frames(frames, batch_size)
+
+        escalated = []
+        for i, detections in enumerate(results):
+            reason = self.escalation_reason(detections, self.frames)
+            self.frames += 1
+            if reason is None:
+                self.reasons["snel"] += 1
+                # De snelle detector meldt alles vanaf hint_threshold: zelfde drempel als de dure detector
+                results[i] = detections[detections.scores >= self.confidence_threshold]
+                continue
+            self.reasons[reason] += 1
+            escalated.append(i)
+
+        # De geëscaleerde frames samen door de dure detector, als één batch
+        if escalated:
+            accurate = self.accurate.detect_frames([frames[i] for i in escalated], batch_size)
+            for i, detections in zip(escalated, accurate):
+                results[i] = detections
+        return results
+
+    def describe(self):
+        escalated = self.frames - self.reasons["snel"]
+        share = escalated / self.frames if self.frames else 0.0
+        details = ", ".join(f"{count} {reason}" for reason, count in self.reasons.most_common() if reason != "snel")
+        return (f"{self.accurate.name} op {escalated}/{self.frames} frames ({share:.0%})"
+                + (f": {details}" if details else ""))
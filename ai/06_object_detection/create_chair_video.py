@@ -4,33 +4,33 @@ Simple Chair Video Creator
 ==========================
 
 Creates a basic MP4 video with a simple chair drawing for testing object detection.
-This script uses only PIL and basic graphics to create a test video.
+This script uses only PIL and basic graphics to create a test video. Frames are
+piped straight into ffmpeg as raw RGB (no temporary PNG files).
 
 Usage:
     python create_chair_video.py
 """
 
+import argparse
+from functools import partial
+import multiprocessing
 import os
+import random
+import time
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
-import subprocess
 import sys
 
-def create_chair_frame(frame_number, total_frames, width=640, height=480):
-    """Create a single frame with a simple, recognizable chair"""
-    
-    # Create image with simple background
-    img = Image.new('RGB', (width, height), color=(240, 240, 240))  # Light gray background
-    draw = ImageDraw.Draw(img)
-    
-    # Simple floor
-    floor_y = height - 60
-    draw.rectangle([0, floor_y, width, height], fill=(200, 200, 200))  # Gray floor
-    
-    # Simple chair animation - just slight left-right movement
-    animation_progress = frame_number / total_frames
-    chair_x = int(width * 0.4 + 40 * (0.5 - 0.5 * abs(2 * animation_progress - 1)))
-    chair_y = floor_y - 100
-    
+from video_writers import VideoEncoder
+
+# Optional: masked copies with OpenCV are much faster than with numpy
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+def draw_simple_chair(draw, chair_x, chair_y):
+    """Draw the simple dining chair (plus shadow) with its top-left corner at (chair_x, chair_y)"""
     # Chair colors - simple and clear
     wood_brown = (139, 69, 19)
     darker_brown = (101, 67, 33)
@@ -82,6 +82,24 @@ def create_chair_frame(frame_number, total_frames, width=640, height=480):
         chair_x + 5, chair_y + 95,
         chair_x + 85, chair_y + 105
     ], fill=(180, 180, 180))
+
+def create_chair_frame(frame_number, total_frames, width=640, height=480):
+    """Create a single frame with a simple, recognizable chair"""
+    
+    # Create image with simple background
+    img = Image.new('RGB', (width, height), color=(240, 240, 240))  # Light gray background
+    draw = ImageDraw.Draw(img)
+    
+    # Simple floor
+    floor_y = height - 60
+    draw.rectangle([0, floor_y, width, height], fill=(200, 200, 200))  # Gray floor
+    
+    # Simple chair animation - just slight left-right movement
+    animation_progress = frame_number / total_frames
+    chair_x = int(width * 0.4 + 40 * (0.5 - 0.5 * abs(2 * animation_progress - 1)))
+    chair_y = floor_y - 100
+    
+    draw_simple_chair(draw, chair_x, chair_y)
     
     # Add frame counter
     try:
@@ -128,78 +146,168 @@ def create_chair_frame(frame_number, total_frames, width=640, height=480):
     
     return img
 
-def create_chair_video(output_filename="chair_video_simple.mp4", duration=10, fps=25):
-    """Create a video with animated chair"""
+def _render_frame_bytes(frame_number, total_frames, width, height):
+    """Worker: render one frame and return its raw RGB bytes"""
+    return create_chair_frame(frame_number, total_frames, width, height).tobytes()
+
+def create_chair_video(output_filename="chair_video_simple.mp4", duration=10, fps=25,
+                       width=640, height=480, workers=None, encoder=None):
+    """Create a video with animated chair
+    
+    Frames are rendered in parallel worker processes and streamed, in order,
+    as raw RGB into ffmpeg (or cv2.VideoWriter when ffmpeg is not installed).
+    encoder is a video_writers.VideoEncoder (default: ffmpeg libx264, preset veryfast).
+    """
     
     # Get the directory where this script is located
     script_dir = os.path.dirname(os.path.abspath(__file__))
     
     total_frames = duration * fps
-    temp_dir = os.path.join(script_dir, "temp_frames")
     output_path = os.path.join(script_dir, output_filename)
+    workers = workers or os.cpu_count() or 1
     
     print(f"🎬 Creating chair video: {output_filename}")
-    print(f"   Duration: {duration}s, FPS: {fps}, Total frames: {total_frames}")
+    print(f"   Duration: {duration}s, FPS: {fps}, Total frames: {total_frames}, Workers: {workers}")
     
-    # Create temp directory for frames
-    if not os.path.exists(temp_dir):
-        os.makedirs(temp_dir)
+    writer = (encoder or VideoEncoder("ffmpeg")).open(output_path, width, height, fps, pix_fmt="rgb24")
     
-    # Generate all frames
+    # Render in parallel; imap returns the frames in order
     print("🎨 Generating frames...")
-    for frame_num in range(total_frames):
-        if frame_num % (total_frames // 10) == 0:  # Progress updates
-            progress = (frame_num / total_frames) * 100
-            print(f"   Progress: {progress:.0f}%")
+    render = partial(_render_frame_bytes, total_frames=total_frames, width=width, height=height)
+    try:
+        with multiprocessing.Pool(workers) as pool:
+            for frame_num, rgb_bytes in enumerate(pool.imap(render, range(total_frames), chunksize=8)):
+                if frame_num % max(1, total_frames // 10) == 0:  # Progress updates
+                    progress = (frame_num / total_frames) * 100
+                    print(f"   Progress: {progress:.0f}%")
+                try:
+                    writer.write(rgb_bytes)
+                except RuntimeError:
+                    break  # ffmpeg stopped early; its error is reported below
+    finally:
+        error = writer.close()
+    
+    if error:
+        print(f"❌ FFmpeg error: {error}")
+        return False
+    
+    print(f"✅ Video created successfully: {output_path}")
+    return True
+
+class ProceduralChairVideo:
+    """
+    Fast synthetic video frames for load tests.
+    
+    The background (wall and floor) and the chair sprite are rendered once with
+    PIL; every frame is a copy of the background with the sprite pasted at each
+    chair's offset (array slicing). This scales to 4K and long durations,
+    unlike create_chair_frame which redraws everything per frame.
+    
+    Args:
+        width, height: frame size; the scene is scaled relative to 640x480
+        objects: number of chairs, spread over the floor in rows
+        total_frames: length of the animation (one left-right cycle)
+        seed: random phase per chair, for reproducible videos
+    """
+    
+    def __init__(self, width=640, height=480, objects=1, total_frames=250, seed=0):
+        self.width, self.height = width, height
+        self.total_frames = total_frames
+        scale = height / 480
         
-        frame = create_chair_frame(frame_num, total_frames)
-        frame_path = os.path.join(temp_dir, f"frame_{frame_num:06d}.png")
-        frame.save(frame_path)
+        self.background = self._render_background(width, height, scale)
+        self.sprite, self.mask = self._render_chair_sprite(scale)
+        self.frame_buffer = np.empty_like(self.background)
+        
+        # Chairs next to each other on the floor; extra rows further back (higher up)
+        sprite_height, sprite_width = self.mask.shape
+        per_row = max(1, int(width // (sprite_width * 1.5)))
+        floor_y = height - int(60 * scale)
+        rng = random.Random(seed)
+        self.amplitude = 40 * scale
+        self.chairs = []
+        for index in range(objects):
+            row, column = divmod(index, per_row)
+            in_row = min(per_row, objects - row * per_row)
+            x = int((column + 0.5) * width / in_row - sprite_width / 2)
+            y = int(floor_y - 100 * scale - row * sprite_height * 0.6)
+            self.chairs.append((x, max(0, y), rng.random()))
+    
+    @staticmethod
+    def _render_background(width, height, scale):
+        img = Image.new('RGB', (width, height), color=(240, 240, 240))  # Light gray background
+        draw = ImageDraw.Draw(img)
+        draw.rectangle([0, height - int(60 * scale), width, height], fill=(200, 200, 200))  # Gray floor
+        draw.text((10, height - 30), "Procedural Chair Test", fill=(100, 100, 100))
+        return np.asarray(img).copy()
+    
+    @staticmethod
+    def _render_chair_sprite(scale):
+        """Chair drawn once on a transparent canvas, scaled; returns (RGB pixels, boolean mask)"""
+        canvas = Image.new('RGBA', (90, 106), (0, 0, 0, 0))
+        draw_simple_chair(ImageDraw.Draw(canvas), 0, 0)
+        if scale != 1:
+            size = (max(1, round(90 * scale)), max(1, round(106 * scale)))
+            canvas = canvas.resize(size, Image.NEAREST)
+        rgba = np.asarray(canvas)
+        return rgba[:, :, :3].copy(), (rgba[:, :, 3] >= 128).astype(np.uint8)
+    
+    def frame(self, frame_number):
+        """RGB frame as a (height, width, 3) array; the buffer is reused for the next frame"""
+        frame = self.frame_buffer
+        np.copyto(frame, self.background)
+        sprite_height, sprite_width = self.mask.shape
+        
+        for x, y, phase in self.chairs:
+            # Same slight left-right movement as create_chair_frame, shifted per chair
+            progress = (frame_number / self.total_frames + phase) % 1.0
+            x += int(self.amplitude * (0.5 - 0.5 * abs(2 * progress - 1)))
+            
+            # Clip to the frame
+            x0, y0 = max(0, x), max(0, y)
+            x1, y1 = min(self.width, x + sprite_width), min(self.height, y + sprite_height)
+            if x0 >= x1 or y0 >= y1:
+                continue
+            rows, cols = slice(y0 - y, y1 - y), slice(x0 - x, x1 - x)
+            if cv2 is not None:
+                cv2.copyTo(self.sprite[rows, cols], self.mask[rows, cols], frame[y0:y1, x0:x1])
+            else:
+                np.copyto(frame[y0:y1, x0:x1], self.sprite[rows, cols], where=self.mask[rows, cols, None] > 0)
+        
+        return frame
+
+def create_procedural_video(output_filename="chair_video_procedural.mp4", width=640, height=480,
+                            objects=1, duration=10, fps=25, seed=0, encoder=None):
+    """Create a (large) synthetic test video with ProceduralChairVideo, fully offline"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    output_path = os.path.join(script_dir, output_filename)
+    total_frames = int(duration * fps)
     
-    # Create video using ffmpeg
-    print("🎞️  Combining frames into video...")
+    print(f"🎬 Creating procedural video: {output_filename}")
+    print(f"   {width}x{height}, {objects} chair(s), Duration: {duration}s, FPS: {fps}, Total frames: {total_frames}")
     
-    # Check if ffmpeg is available
+    generator = ProceduralChairVideo(width, height, objects, total_frames, seed)
+    writer = (encoder or VideoEncoder("ffmpeg")).open(output_path, width, height, fps, pix_fmt="rgb24")
+    
+    start_time = time.perf_counter()
     try:
-        subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
-        ffmpeg_available = True
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        ffmpeg_available = False
-    
-    if ffmpeg_available:
-        # Use ffmpeg to create video
-        cmd = [
-            'ffmpeg', '-y',  # -y to overwrite
-            '-framerate', str(fps),
-            '-i', f'{temp_dir}/frame_%06d.png',
-            '-c:v', 'libx264',
-            '-pix_fmt', 'yuv420p',
-            '-crf', '23',
-            output_path
-        ]
-        
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0:
-                print(f"✅ Video created successfully: {output_path}")
-            else:
-                print(f"❌ FFmpeg error: {result.stderr}")
-                return False
-        except Exception as e:
-            print(f"❌ Error running ffmpeg: {e}")
-            return False
-    else:
-        print("⚠️  FFmpeg not found. Alternative: use online converter or install ffmpeg")
-        print("   Frames are available in:", temp_dir)
-        print("   You can manually convert them to video using:")
-        print(f"   ffmpeg -framerate {fps} -i {temp_dir}/frame_%06d.png -c:v libx264 {output_path}")
+        for frame_num in range(total_frames):
+            if frame_num % max(1, total_frames // 10) == 0:  # Progress updates
+                print(f"   Progress: {frame_num / total_frames * 100:.0f}%")
+            frame = generator.frame(frame_num)
+            try:
+                writer.write(frame)
+            except RuntimeError:
+                break  # ffmpeg stopped early; its error is reported below
+    finally:
+        error = writer.close()
+    
+    if error:
+        print(f"❌ FFmpeg error: {error}")
         return False
     
-    # Cleanup temp files
-    print("🧹 Cleaning up temporary files...")
-    import shutil
-    shutil.rmtree(temp_dir)
-    
+    elapsed = time.perf_counter() - start_time
+    print(f"✅ Video created successfully: {output_path} ({total_frames / elapsed:.1f} frames/s)")
     return True
 
 def create_chair_image(filename="chair_test.jpg"):
@@ -417,11 +525,31 @@ def main():
         if sys.argv[1] == '--image':
             create_chair_image()
             return
+        elif sys.argv[1] == '--procedural':
+            parser = argparse.ArgumentParser(prog="create_chair_video.py --procedural",
+                                             description="Fast synthetic load-test video")
+            parser.add_argument("--output", default="chair_video_procedural.mp4", help="Output file name")
+            parser.add_argument("--width", type=int, default=640)
+            parser.add_argument("--height", type=int, default=480)
+            parser.add_argument("--objects", type=int, default=1, help="Number of chairs")
+            parser.add_argument("--duration", type=float, default=10, help="Seconds")
+            parser.add_argument("--fps", type=int, default=25)
+            parser.add_argument("--seed", type=int, default=0)
+            parser.add_argument("--codec", default="libx264", help="ffmpeg codec, e.g. libx264 or h264_nvenc")
+            parser.add_argument("--preset", help="Codec preset (default: veryfast for libx264)")
+            parser.add_argument("--encode-threads", type=int, help="ffmpeg encoder threads (default: ffmpeg decides)")
+            args = parser.parse_args(sys.argv[2:])
+            encoder = VideoEncoder("ffmpeg", codec=args.codec, preset=args.preset, threads=args.encode_threads)
+            create_procedural_video(args.output, args.width, args.height, args.objects,
+                                    args.duration, args.fps, args.seed, encoder)
+            return
         elif sys.argv[1] == '--help':
             print("Usage:")
-            print("  python create_chair_video.py           # Create video")
-            print("  python create_chair_video.py --image   # Create single image")
-            print("  python create_chair_video.py --help    # Show this help")
+            print("  python create_chair_video.py                # Create video")
+            print("  python create_chair_video.py --image        # Create single image")
+            print("  python create_chair_video.py --procedural   # Fast synthetic video, e.g.")
+            print("      --procedural --width 3840 --height 2160 --objects 12 --duration 600")
+            print("  python create_chair_video.py --help         # Show this help")
             return
     
     # Interactive mode
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Detectie cache op basis van beeld-inhoud
+========================================
+
+Slaat de detecties van een afbeelding/frame op onder een hash van de pixels,
+de modelnaam en de confidence threshold. Dezelfde afbeelding nog een keer
+(of een identiek frame van een statische camera) kost dan geen inference.
+
+    cache = DetectionCache("detections_cache.sqlite", max_entries=10000)
+    detector = SimpleObjectDetector(result_cache=cache)
+
+De cache is een SQLite bestand met LRU gedrag: bij meer dan max_entries
+regels verdwijnen de langst niet gebruikte. Meerdere processen (--workers)
+kunnen hetzelfde bestand delen.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+
+import numpy as np
+
+from detection_results import Detections, detection_to_dict
+
+
+def image_hash(pixels, shape):
+    """Hash van de ruwe pixels plus de vorm (zelfde bytes, andere vorm = ander beeld)"""
+    digest = hashlib.blake2b(str(shape).encode(), digest_size=16)
+    digest.update(pixels)
+    return digest.hexdigest()
+
+
+def frame_hash(frame):
+    """Hash van een OpenCV/NumPy frame"""
+    return image_hash(np.ascontiguousarray(frame).data, frame.shape)
+
+
+def pil_hash(image):
+    """Hash van een PIL Image"""
+    return image_hash(image.tobytes(), (image.mode, image.size))
+
+
+class DetectionCache:
+    """
+    LRU cache voor detecties in SQLite.
+
+    Args:
+        path: SQLite bestand (":memory:" voor een cache die alleen deze run leeft)
+        max_entries: maximum aantal opgeslagen afbeeldingen
+    """
+
+    def __init__(self, path, max_entries=10000):
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        # check_same_thread=False: de pipeline roept de detector aan vanuit de inference thread
+        self.connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS detections ("
+                " key TEXT PRIMARY KEY, detections TEXT NOT NULL, last_used REAL NOT NULL)"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS detections_last_used ON detections (last_used)"
+            )
+
+    @staticmethod
+    def make_key(content_hash, model_name, confidence_threshold):
+        """Andere modelnaam of threshold = andere detecties, dus ander cache item"""
+        return f"{model_name}|{confidence_threshold:g}|{content_hash}"
+
+    def get_many(self, keys):
+        """Detecties per key, None voor een miss; hits tellen als recent gebruikt"""
+        found = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.connection.execute(
+                f"SELECT key, detections FROM detections WHERE key IN ({placeholders})", chunk
+            )
+            found.update(rows)
+
+        if found:
+            now = time.time()
+            with self.connection:
+                self.connection.executemany(
+                    "UPDATE detections SET last_used = ? WHERE key = ?", [(now, key) for key in found]
+                )
+
+        results = []
+        for key in keys:
+            if key in found:
+                self.hits += 1
+                results.append(self._decode(found[key]))
+            else:
+                self.misses += 1
+                results.append(None)
+        return results
+
+    def put_many(self, items):
+        """Sla (key, detecties) paren op en ruim daarna de oudste items op"""
+        now = time.time()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO detections (key, detections, last_used) VALUES (?, ?, ?)",
+                [(key, json.dumps([detection_to_dict(d) for d in detections]), now)
+                 for key, detections in items],
+            )
+            (count,) = self.connection.execute("SELECT COUNT(*) FROM detections").fetchone()
+            if count > self.max_entries:
+                self.connection.execute(
+                    "DELETE FROM detections WHERE key IN ("
+                    " SELECT key FROM detections ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+
+    @staticmethod
+    def _decode(text):
+        """Zelfde type als de detector geeft: Detections"""
+        return Detections.from_dicts(json.loads(text))
+
+    def describe(self):
+        total = self.hits + self.misses
+        rate = f", {self.hits / total * 100:.0f}% hits" if total else ""
+        return f"{self.hits} hits, {self.misses} misses{rate} ({self.path})"
+
+    def close(self):
+        self.connection.close()
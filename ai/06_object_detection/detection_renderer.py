@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Detecties tekenen op BGR frames
+===============================
+
+cv2.putText rendert de Hershey letters elke keer opnieuw als lijnstukken,
+en dat is per detectie het duurste deel van het tekenen. DetectionRenderer
+rendert elke tekst ("chair: 0.93", met track ID "#4 chair: 0.93") één keer
+naar een sprite (gekleurde patch + masker) en kopieert die daarna met
+cv2.copyTo in een slice van het frame. De confidence staat met 2 decimalen
+in de tekst, dus er zijn per label hooguit 100 varianten.
+
+Boxes worden als geneste 1-pixel rechthoeken getekend: cv2's algoritme voor
+dikke lijnen (ronde hoeken) is ongeveer twee keer zo traag, en losse NumPy
+slice-toewijzingen zijn per box nog trager (zie `python benchmark.py --drawing`).
+
+    renderer = DetectionRenderer(color=(0, 255, 0))
+    frame = renderer.draw(frame, detections)
+
+draw_reference is de oude aanpak (cv2.rectangle + cv2.putText per detectie),
+als referentie voor de benchmark.
+"""
+
+import cv2
+import numpy as np
+
+
+def detection_text(detection):
+    """Label tekst zoals op het frame: 'label: 0.93', met track ID '#4 label: 0.93'"""
+    text = f"{detection['label']}: {detection['confidence']:.2f}"
+    if "track_id" in detection:
+        text = f"#{detection['track_id']} {text}"
+    return text
+
+
+def draw_reference(frame, detections, color=(0, 255, 0), thickness=2, font_scale=0.6):
+    """Per detectie cv2.rectangle + cv2.putText (referentie voor de benchmark)"""
+    for detection in detections:
+        x1, y1, x2, y2 = (int(v) for v in detection["box"])
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, thickness)
+        cv2.putText(frame, detection_text(detection), (x1, max(30, y1 - 10)),
+                    cv2.FONT_HERSHEY_SIMPLEX, font_scale, color, thickness)
+    return frame
+
+
+class DetectionRenderer:
+    """
+    Tekent boxes en labels direct in een (H, W, 3) uint8 array.
+
+    Args:
+        color: kleur in de volgorde van het frame (BGR voor OpenCV, RGB voor PIL arrays)
+        thickness: lijndikte van boxes en tekst
+        font_scale: grootte van de tekst (cv2.FONT_HERSHEY_SIMPLEX)
+        max_sprites: maximum aantal gecachte teksten, daarna wordt de cache geleegd
+    """
+
+    def __init__(self, color=(0, 255, 0), thickness=2, font_scale=0.6, max_sprites=4096):
+        self.color = np.asarray(color, dtype=np.uint8)
+        self.thickness = thickness
+        self.font_scale = font_scale
+        self.max_sprites = max_sprites
+        self.sprites = {}
+
+    def sprite(self, text):
+        """(gekleurde patch, masker, hoogte boven de baseline) van een tekst; één keer gerenderd"""
+        sprite = self.sprites.get(text)
+        if sprite is None:
+            if len(self.sprites) >= self.max_sprites:
+                self.sprites.clear()
+            (width, height), baseline = cv2.getTextSize(
+                text, cv2.FONT_HERSHEY_SIMPLEX, self.font_scale, self.thickness)
+            ascent = height + self.thickness
+            canvas = np.zeros((ascent + baseline + self.thickness, width + self.thickness), dtype=np.uint8)
+            cv2.putText(canvas, text, (0, ascent), cv2.FONT_HERSHEY_SIMPLEX,
+                        self.font_scale, 255, self.thickness)
+            # Anti-aliased randen afronden naar aan/uit, zodat kopiëren één C aanroep is
+            mask = (canvas >= 128).astype(np.uint8)
+            patch = np.empty(canvas.shape + (3,), dtype=np.uint8)
+            patch[:] = self.color
+            sprite = (patch, mask, ascent)
+            self.sprites[text] = sprite
+        return sprite
+
+    def draw(self, frame, detections):
+        """Teken alle detecties in frame (in place) en geef het frame terug"""
+        frame_height, frame_width = frame.shape[:2]
+        color = tuple(int(c) for c in self.color)
+        # Zelfde band als cv2.rectangle met deze dikte: coördinaat - half tot + half
+        half = 0 if self.thickness == 1 else (self.thickness + 1) // 2
+        offsets = range(-half, half + 1)
+
+        for detection in detections:
+            x1, y1, x2, y2 = (int(v) for v in detection["box"])
+            for offset in offsets:
+                cv2.rectangle(frame, (x1 - offset, y1 - offset), (x2 + offset, y2 + offset), color, 1)
+
+            # Label: gecachte sprite op dezelfde plek als cv2.putText (baseline op y1 - 10)
+            patch, mask, ascent = self.sprite(detection_text(detection))
+            top = max(30, y1 - 10) - ascent
+
+            # Afknippen aan de randen van het frame
+            y0, x0 = max(0, top), max(0, x1)
+            y_end = min(frame_height, top + mask.shape[0])
+            x_end = min(frame_width, x1 + mask.shape[1])
+            if y0 < y_end and x0 < x_end:
+                sprite_rows = slice(y0 - top, y_end - top)
+                sprite_cols = slice(x0 - x1, x_end - x1)
+                cv2.copyTo(patch[sprite_rows, sprite_cols], mask[sprite_rows, sprite_cols],
+                           frame[y0:y_end, x0:x_end])
+
+        return frame
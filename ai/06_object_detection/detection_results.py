@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Detectie resultaten
+===================
+
+Detections is het resultaat type van alle detectors (zie detectors.py): de
+detecties van één beeld als NumPy arrays (boxes, scores, label ids) in plaats
+van een lijst dicts. Itereren geeft nog wel dicts, zodat tekenen, tracking en
+statistieken met beide vormen werken:
+
+    detections = detector.detect_objects(frame)
+    detections.boxes        # (N, 4) int32, [x1, y1, x2, y2]
+    detections.scores       # (N,) float32
+    detections.labels       # ["chair", ...]
+    for detection in detections:
+        detection["label"], detection["confidence"], detection["box"]
+
+JsonlResultsWriter schrijft per verwerkt frame één JSON regel met alle detecties, zodat je de
+resultaten van een (headless) run later kunt inlezen zonder de geannoteerde
+video te bekijken:
+
+    {"frame": 30, "time": 1.2, "keyframe": true, "detections": [{"label": "chair", "confidence": 0.97, "box": [x1, y1, x2, y2]}]}
+
+Met tracking krijgt elke detectie ook een "track_id" en staan ook de
+overgeslagen frames erin (met "keyframe": false).
+"""
+
+import json
+
+import numpy as np
+
+
+def detection_to_dict(detection):
+    """Zet een detectie om naar iets dat json.dumps aankan (numpy box -> list van ints)"""
+    result = {
+        "label": detection["label"],
+        "confidence": round(float(detection["confidence"]), 4),
+        "box": [int(v) for v in detection["box"]],
+    }
+    if "track_id" in detection:
+        result["track_id"] = int(detection["track_id"])
+    return result
+
+
+class Detections:
+    """
+    Detecties van één beeld, als arrays met één rij per detectie.
+
+    Args:
+        boxes: (N, 4) [x1, y1, x2, y2] in pixels (afgerond naar int32)
+        scores: (N,) confidence
+        label_ids: (N,) index in names
+        names: labelnaam per id, lijst of dict (bijv. model.config.id2label); wordt gedeeld, niet gekopieerd
+        track_ids: (N,) track ID per detectie, of None zonder tracking
+    """
+
+    __slots__ = ("boxes", "scores", "label_ids", "names", "track_ids")
+
+    def __init__(self, boxes, scores, label_ids, names, track_ids=None):
+        self.boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+        self.scores = np.asarray(scores, dtype=np.float32).reshape(-1)
+        self.label_ids = np.asarray(label_ids, dtype=np.int32).reshape(-1)
+        self.names = names
+        self.track_ids = None if track_ids is None else np.asarray(track_ids, dtype=np.int32).reshape(-1)
+
+    @classmethod
+    def empty(cls, names=()):
+        return cls(np.zeros((0, 4)), [], [], names)
+
+    @classmethod
+    def from_dicts(cls, detections):
+        """Van een lijst dicts ({"label", "confidence", "box"}, optioneel "track_id")"""
+        detections = list(detections)
+        if not detections:
+            return cls.empty()
+        names = sorted({d["label"] for d in detections})
+        ids = {name: i for i, name in enumerate(names)}
+        track_ids = None
+        if all("track_id" in d for d in detections):
+            track_ids = [d["track_id"] for d in detections]
+        return cls([d["box"] for d in detections], [d["confidence"] for d in detections],
+                   [ids[d["label"]] for d in detections], names, track_ids)
+
+    @classmethod
+    def concatenate(cls, parts):
+        """Voeg de detecties van meerdere delen (bijv. tiles van één beeld) samen"""
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return cls.empty()
+        names = parts[0].names
+        if any(part.names is not names and part.names != names for part in parts):
+            # Verschillende label tabellen: via de namen samenvoegen
+            return cls.from_dicts(detection for part in parts for detection in part)
+        track_ids = None
+        if all(part.track_ids is not None for part in parts):
+            track_ids = np.concatenate([part.track_ids for part in parts])
+        return cls(np.concatenate([part.boxes for part in parts]), np.concatenate([part.scores for part in parts]),
+                   np.concatenate([part.label_ids for part in parts]), names, track_ids)
+
+    @property
+    def labels(self):
+        return [self.names[i] for i in self.label_ids.tolist()]
+
+    def __len__(self):
+        return len(self.scores)
+
+    def __getitem__(self, index):
+        """Een int geeft één detectie als dict, een slice/masker/index array een nieuwe Detections"""
+        if isinstance(index, (int, np.integer)):
+            return self._detection(index)
+        return Detections(self.boxes[index], self.scores[index], self.label_ids[index], self.names,
+                          None if self.track_ids is None else self.track_ids[index])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._detection(i)
+
+    def _detection(self, i):
+        detection = {
+            "label": self.names[int(self.label_ids[i])],
+            "confidence": float(self.scores[i]),
+            "box": self.boxes[i],
+        }
+        if self.track_ids is not None:
+            detection["track_id"] = int(self.track_ids[i])
+        return detection
+
+    def __repr__(self):
+        items = ", ".join(f"{label}: {score:.2f}" for label, score in zip(self.labels, self.scores))
+        return f"Detections({items})"
+
+
+def as_detections(detections):
+    """Detections ongewijzigd, een lijst dicts omgezet"""
+    return detections if isinstance(detections, Detections) else Detections.from_dicts(detections)
+
+
+class JsonlResultsWriter:
+    """Schrijft detecties per frame naar een .jsonl bestand"""
+
+    def __init__(self, path, fps):
+        self.path = path
+        self.fps = fps or 0
+        self.file = open(path, "w", encoding="utf-8")
+        self.frames_written = 0
+
+    def write(self, frame_index, detections, keyframe=True, extra=None):
+        """
+        Schrijf de detecties van één frame (keyframe=False: voorspeld door de tracker).
+
+        extra: extra velden voor deze regel, bijv. captured_at en latency_ms bij live bronnen
+        """
+        record = {
+            "frame": frame_index,
+            "time": round(frame_index / self.fps, 3) if self.fps else None,
+            "keyframe": keyframe,
+            **(extra or {}),
+            "detections": [detection_to_dict(d) for d in detections],
+        }
+        self.file.write(json.dumps(record) + "\n")
+        self.frames_written += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
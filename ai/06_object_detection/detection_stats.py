@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Detectie statistieken met vast geheugen
+=======================================
+
+Per label: aantal detecties, aantal gevolgde objecten, en gemiddelde,
+variantie, min, max en kwantielen van de confidence. Alles wordt per
+detectie bijgewerkt (Welford voor gemiddelde/variantie, een histogram
+over [0, 1] als kwantiel-sketch), dus een video van uren gebruikt evenveel
+geheugen als een video van seconden.
+
+    stats = DetectionStats(snapshot_interval=30)
+    stats.update(detections, new_tracks)
+    snapshot = stats.periodic_snapshot()   # elke 30s een dict, anders None
+
+Statistieken van meerdere segmenten (--workers) worden met merge()
+samengevoegd.
+"""
+
+import math
+import time
+
+import numpy as np
+
+
+class RunningStats:
+    """
+    Streaming statistieken van een waarde in [0, 1] (confidence).
+
+    Args:
+        bins: aantal histogram bins; kwantielen zijn nauwkeurig tot 1 / bins
+    """
+
+    def __init__(self, bins=100):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.histogram = np.zeros(bins, dtype=np.int64)
+
+    def add(self, value):
+        # Welford: numeriek stabiel, zonder alle waarden te bewaren
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+        bins = len(self.histogram)
+        self.histogram[min(bins - 1, max(0, int(value * bins)))] += 1
+
+    def merge(self, other):
+        """Voeg de statistieken van een ander deel (bijv. segment) toe (Chan et al.)"""
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.histogram += other.histogram
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def quantile(self, q):
+        """Benaderd kwantiel (midden van de bin), begrensd door de echte min/max"""
+        if self.count == 0:
+            return math.nan
+        rank = q * (self.count - 1)
+        index = int(np.searchsorted(np.cumsum(self.histogram), rank, side="right"))
+        value = (index + 0.5) / len(self.histogram)
+        return min(self.max, max(self.min, value))
+
+
+class LabelStats(RunningStats):
+    """Confidence statistieken van één label plus het aantal gevolgde objecten"""
+
+    def __init__(self, bins=100):
+        super().__init__(bins)
+        self.objects = 0
+
+    def merge(self, other):
+        super().merge(other)
+        self.objects += other.objects
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "objects": self.objects,
+            "mean": self.mean,
+            "std": self.std,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+        }
+
+
+class DetectionStats:
+    """
+    Statistieken per label over een hele run.
+
+    Args:
+        snapshot_interval: seconden tussen snapshots van periodic_snapshot (None = nooit)
+    """
+
+    def __init__(self, snapshot_interval=None):
+        self.labels = {}
+        self.model = None  # naam van de detector, gezet door wie de run start
+        self.snapshot_interval = snapshot_interval
+        self.last_snapshot = time.monotonic()
+
+    def update(self, detections, new_tracks=()):
+        """Tel de detecties van één frame; elke nieuwe track is een nieuw object"""
+        for detection in detections:
+            label = detection["label"]
+            if label not in self.labels:
+                self.labels[label] = LabelStats()
+            self.labels[label].add(float(detection["confidence"]))
+        for track in new_tracks:
+            self.labels[track.label].objects += 1
+
+    def merge(self, other):
+        for label, stats in other.labels.items():
+            self.labels.setdefault(label, LabelStats()).merge(stats)
+        self.model = self.model or other.model
+        return self
+
+    def items(self):
+        """(label, LabelStats), meest gedetecteerde label eerst"""
+        return sorted(self.labels.items(), key=lambda item: item[1].count, reverse=True)
+
+    def snapshot(self):
+        return {label: stats.summary() for label, stats in self.items()}
+
+    def periodic_snapshot(self):
+        """Een snapshot als er snapshot_interval seconden voorbij zijn, anders None"""
+        if self.snapshot_interval is None:
+            return None
+        now = time.monotonic()
+        if now - self.last_snapshot < self.snapshot_interval:
+            return None
+        self.last_snapshot = now
+        return self.snapshot()
+
+    def __bool__(self):
+        return bool(self.labels)
+
+
+def format_snapshot(snapshot):
+    """Compacte regel voor tussentijdse output: label n=.. mean=.. p50=.."""
+    return "; ".join(
+        f"{label} n={stats['count']} mean={stats['mean']:.3f} p50={stats['p50']:.3f}"
+        for label, stats in snapshot.items()
+    ) or "-"
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Detectie store
+==============
+
+Alle detecties van verwerkte video's in één SQLite bestand, één regel per
+detectie (video, frame, tijd, label, score, box), zodat je achteraf kunt
+zoeken zonder video's opnieuw te bekijken:
+
+    python TRYME.py --input video.mp4 --store detecties.sqlite --headless
+    python detection_store.py detecties.sqlite query --label chair --min-score 0.9
+    python detection_store.py detecties.sqlite frames --label chair --min-score 0.9 --video video.mp4
+    python detection_store.py detecties.sqlite import video.mp4 detections.jsonl --model facebook/detr-resnet-50
+    python detection_store.py detecties.sqlite summary
+
+Inserts gaan in batches (executemany per batch_size regels, één transactie
+per batch). Indexes op (label, score) en (video, tijd) houden zoekvragen ook
+over duizenden video's in de milliseconden. Een video opnieuw verwerken
+vervangt zijn vorige detecties.
+"""
+
+import argparse
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+from detection_results import Detections
+
+# Optioneel: alleen nodig om fps en grootte uit de video te lezen (import zonder --fps)
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+def probe_video(video_path):
+    """(fps, width, height) van een video bestand; None waar het niet te lezen is"""
+    if cv2 is None:
+        return None, None, None
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        return None, None, None
+    fps = cap.get(cv2.CAP_PROP_FPS) or None
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or None
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or None
+    cap.release()
+    return fps, width, height
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    model TEXT,
+    fps REAL,
+    width INTEGER,
+    height INTEGER,
+    processed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS videos_name ON videos (name);
+
+CREATE TABLE IF NOT EXISTS detections (
+    video_id INTEGER NOT NULL REFERENCES videos (id),
+    frame INTEGER NOT NULL,
+    time REAL,
+    label TEXT NOT NULL,
+    score REAL NOT NULL,
+    x1 INTEGER NOT NULL,
+    y1 INTEGER NOT NULL,
+    x2 INTEGER NOT NULL,
+    y2 INTEGER NOT NULL,
+    track_id INTEGER,
+    keyframe INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS detections_label_score ON detections (label, score);
+CREATE INDEX IF NOT EXISTS detections_video_time ON detections (video_id, time);
+CREATE INDEX IF NOT EXISTS detections_time ON detections (time);
+"""
+
+
+class DetectionStore:
+    """
+    SQLite store voor detecties van meerdere video's.
+
+    Args:
+        path: SQLite bestand (wordt aangemaakt als het nog niet bestaat)
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        # check_same_thread=False: in --pipeline modus schrijft de encode thread
+        self.connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        # WAL: lezers (queries) blokkeren een lopende run niet
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+
+    def add_video(self, video_path, fps=None, width=None, height=None, model=None):
+        """Registreer een video (vervangt een eerdere run van dezelfde video), geeft het video id"""
+        path = str(Path(video_path).resolve())
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM detections WHERE video_id IN (SELECT id FROM videos WHERE path = ?)", (path,)
+            )
+            self.connection.execute("DELETE FROM videos WHERE path = ?", (path,))
+            cursor = self.connection.execute(
+                "INSERT INTO videos (path, name, model, fps, width, height, processed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, Path(path).name, model, fps or None, width, height, time.time()),
+            )
+        return cursor.lastrowid
+
+    def writer(self, video_id, fps, batch_size=5000):
+        """Een StoreResultsWriter voor deze video (zelfde interface als JsonlResultsWriter)"""
+        return StoreResultsWriter(self, video_id, fps, batch_size)
+
+    def insert_rows(self, rows):
+        """Bulk insert van (video_id, frame, time, label, score, x1, y1, x2, y2, track_id, keyframe)"""
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO detections (video_id, frame, time, label, score, x1, y1, x2, y2, track_id, keyframe)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def import_jsonl(self, video_path, jsonl_path, fps=None, width=None, height=None, model=None, batch_size=5000):
+        """
+        Importeer een --results bestand van een eerdere (of --workers) run; geeft het aantal detecties.
+
+        fps, width, height en model komen in de videos tabel (zoals bij add_video);
+        fps geeft ook de tijd van regels zonder "time". Wat niet opgegeven is,
+        blijft zoals het bij een eerdere run van deze video stond.
+        """
+        previous = self.connection.execute(
+            "SELECT fps, width, height, model FROM videos WHERE path = ?", (str(Path(video_path).resolve()),)
+        ).fetchone()
+        if previous is not None:
+            fps = fps or previous["fps"]
+            width = width or previous["width"]
+            height = height or previous["height"]
+            model = model or previous["model"]
+        video_id = self.add_video(video_path, fps, width, height, model=model)
+        with self.writer(video_id, fps=fps, batch_size=batch_size) as writer:
+            with open(jsonl_path, encoding="utf-8") as f:
+                for line in f:
+                    record = json.loads(line)
+                    writer.write(record["frame"], record["detections"], keyframe=record.get("keyframe", True),
+                                 time_seconds=record.get("time"))
+        return writer.rows_written
+
+    def _where(self, label=None, min_score=None, video=None, start=None, end=None):
+        conditions, params = [], []
+        if label is not None:
+            conditions.append("d.label = ?")
+            params.append(label)
+        if min_score is not None:
+            conditions.append("d.score >= ?")
+            params.append(min_score)
+        if video is not None:
+            # Volledig pad of alleen de bestandsnaam
+            conditions.append("(v.path = ? OR v.name = ?)")
+            params += [str(Path(video).resolve()), Path(video).name]
+        if start is not None:
+            conditions.append("d.time >= ?")
+            params.append(start)
+        if end is not None:
+            conditions.append("d.time < ?")
+            params.append(end)
+        return (" WHERE " + " AND ".join(conditions)) if conditions else "", params
+
+    def query(self, label=None, min_score=None, video=None, start=None, end=None, limit=None):
+        """
+        Detecties die aan alle opgegeven filters voldoen, hoogste score eerst.
+
+        Args:
+            video: pad of bestandsnaam
+            start, end: tijd in seconden, [start, end)
+        """
+        where, params = self._where(label, min_score, video, start, end)
+        sql = ("SELECT v.path AS video, d.frame, d.time, d.label, d.score, d.x1, d.y1, d.x2, d.y2, d.track_id"
+               " FROM detections d JOIN videos v ON v.id = d.video_id" + where +
+               " ORDER BY d.score DESC")
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [dict(row) for row in self.connection.execute(sql, params)]
+
+    def frames(self, label=None, min_score=None, video=None, start=None, end=None, limit=None):
+        """Frames met minstens één passende detectie: (video, frame, tijd, aantal, hoogste score)"""
+        where, params = self._where(label, min_score, video, start, end)
+        sql = ("SELECT v.path AS video, d.frame, d.time, COUNT(*) AS detections, MAX(d.score) AS max_score"
+               " FROM detections d JOIN videos v ON v.id = d.video_id" + where +
+               " GROUP BY d.video_id, d.frame ORDER BY d.video_id, d.frame")
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [dict(row) for row in self.connection.execute(sql, params)]
+
+    def summary(self):
+        """Per label: aantal detecties, aantal video's en gemiddelde score"""
+        rows = self.connection.execute(
+            "SELECT label, COUNT(*) AS detections, COUNT(DISTINCT video_id) AS videos, AVG(score) AS mean_score"
+            " FROM detections GROUP BY label ORDER BY detections DESC"
+        )
+        return [dict(row) for row in rows]
+
+    def describe(self):
+        (videos,) = self.connection.execute("SELECT COUNT(*) FROM videos").fetchone()
+        (detections,) = self.connection.execute("SELECT COUNT(*) FROM detections").fetchone()
+        return f"{detections} detecties van {videos} video's ({self.path})"
+
+    def close(self):
+        # Statistieken voor de query planner bijwerken (begrensd, dus ook snel bij miljoenen regels):
+        # zonder die statistieken kiest SQLite bij label + video de label index in plaats van (video, tijd)
+        self.connection.execute("PRAGMA analysis_limit=1000")
+        self.connection.execute("PRAGMA optimize")
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class StoreResultsWriter:
+    """Buffert de detecties van één video en schrijft ze per batch naar de DetectionStore"""
+
+    def __init__(self, store, video_id, fps, batch_size=5000):
+        self.store = store
+        self.video_id = video_id
+        self.fps = fps or 0
+        self.batch_size = batch_size
+        self.rows = []
+        self.rows_written = 0
+        self.frames_written = 0
+
+    def write(self, frame_index, detections, keyframe=True, extra=None, time_seconds=None):
+        """Zelfde aanroep als JsonlResultsWriter.write; extra velden worden niet opgeslagen"""
+        if time_seconds is None and self.fps:
+            time_seconds = round(frame_index / self.fps, 3)
+        if isinstance(detections, Detections):
+            # Direct uit de arrays, zonder een dict per detectie
+            track_ids = detections.track_ids.tolist() if detections.track_ids is not None else [None] * len(detections)
+            self.rows.extend(
+                (self.video_id, frame_index, time_seconds, label, round(score, 4), *box, track_id, int(keyframe))
+                for label, score, box, track_id in zip(detections.labels, detections.scores.tolist(),
+                                                       detections.boxes.tolist(), track_ids)
+            )
+            detections = ()
+        for detection in detections:
+            x1, y1, x2, y2 = (int(v) for v in detection["box"])
+            track_id = detection.get("track_id")
+            self.rows.append((self.video_id, frame_index, time_seconds, detection["label"],
+                              round(float(detection["confidence"]), 4), x1, y1, x2, y2,
+                              None if track_id is None else int(track_id), int(keyframe)))
+        self.frames_written += 1
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self.store.insert_rows(self.rows)
+            self.rows_written += len(self.rows)
+            self.rows = []
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def print_rows(rows):
+    if not rows:
+        print("(geen resultaten)")
+        return
+    columns = list(rows[0])
+    print("\t".join(columns))
+    for row in rows:
+        print("\t".join("" if row[c] is None else f"{row[c]:.4g}" if isinstance(row[c], float) else str(row[c])
+                        for c in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zoek in opgeslagen detecties")
+    parser.add_argument("store", help="SQLite bestand (van TRYME.py --store)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name, help_text in (("query", "Detecties die aan de filters voldoen"),
+                            ("frames", "Frames met minstens één passende detectie")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--label", help="Label, bijv. chair")
+        command.add_argument("--min-score", type=float, help="Minimale confidence")
+        command.add_argument("--video", help="Pad of bestandsnaam van de video")
+        command.add_argument("--start", type=float, help="Vanaf tijd (seconden)")
+        command.add_argument("--end", type=float, help="Tot tijd (seconden)")
+        command.add_argument("--limit", type=int, default=100, help="Maximum aantal regels (default: 100, 0 = alles)")
+
+    import_command = commands.add_parser("import", help="Importeer een .jsonl bestand van TRYME.py --results")
+    import_command.add_argument("video", help="De video waar de detecties bij horen")
+    import_command.add_argument("results", help="Het .jsonl bestand")
+    import_command.add_argument("--model", help="Naam van de detector die de detecties maakte")
+    import_command.add_argument("--fps", type=float, help="FPS van de video (default: uit de video gelezen)")
+    commands.add_parser("summary", help="Aantal detecties per label")
+
+    args = parser.parse_args()
+
+    with DetectionStore(args.store) as store:
+        start_time = time.perf_counter()
+        if args.command == "import":
+            fps, width, height = probe_video(args.video)
+            count = store.import_jsonl(args.video, args.results, args.fps or fps, width, height, model=args.model)
+            print(f"📥 {count} detecties geïmporteerd: {store.describe()}")
+            return
+        if args.command == "summary":
+            rows = store.summary()
+        else:
+            search = store.query if args.command == "query" else store.frames
+            rows = search(args.label, args.min_score, args.video, args.start, args.end, args.limit or None)
+        elapsed = (time.perf_counter() - start_time) * 1000
+        print_rows(rows)
+        print(f"\n🔍 {len(rows)} regels in {elapsed:.1f}ms ({store.describe()})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Eén interface voor alle detectors
+=================================
+
+Elke backend (DETR in TRYME.py, geëxporteerde DETR in onnx_backend.py,
+OpenCV DNN, Ultralytics en TensorFlow in alternatives.py, YOLOv5 in
+TRYME_YOLO.py) is een Detector:
+
+    detections = detector.detect_objects(frame)          # één BGR frame (of PIL Image)
+    batch = detector.detect_frames(frames, batch_size=8)  # lijst BGR frames
+
+en geeft Detections terug (zie detection_results.py). De video- en batch
+pipelines gebruiken alleen deze twee methodes, dus de snelste backend op een
+machine kiezen is alleen een kwestie van --backend:
+
+    detector = create_detector("opencv", confidence_threshold=0.5)
+
+Een nieuwe backend implementeert alleen _detect_bgr(frames, batch_size); de
+result cache (--result-cache) werkt dan vanzelf ook voor die backend.
+"""
+
+import numpy as np
+
+from detection_cache import DetectionCache, frame_hash
+
+BACKENDS = ["detr", "detr-int8", "onnx", "onnx-opencv", "opencv", "ultralytics", "tensorflow", "yolov5"]
+
+
+class Detector:
+    """
+    Basis voor alle detectors: BGR frames in, één Detections per frame uit.
+
+    Subklassen zetten name (voor de cache key) en confidence_threshold, en
+    implementeren _detect_bgr.
+    """
+
+    name = "detector"
+    confidence_threshold = 0.5
+    result_cache = None
+
+    @property
+    def available(self):
+        """False als het model niet geladen kon worden (package of modelbestanden ontbreken)"""
+        return True
+
+    def use_result_cache(self, result_cache, max_entries=10000):
+        """DetectionCache of pad naar een SQLite bestand; None zet de cache uit"""
+        if result_cache is not None and not isinstance(result_cache, DetectionCache):
+            result_cache = DetectionCache(result_cache, max_entries=max_entries)
+        self.result_cache = result_cache
+
+    def detect_objects(self, image):
+        """Detecteer objecten in één beeld: BGR ndarray of PIL Image"""
+        if not isinstance(image, np.ndarray):
+            image = np.ascontiguousarray(np.asarray(image.convert("RGB"))[:, :, ::-1])
+        return self.detect_frames([image])[0]
+
+    def detect_frames(self, frames, batch_size=8):
+        """Detecteer objecten in een lijst OpenCV (BGR) frames, batch_size per forward pass"""
+        return self._detect_cached(frames, frame_hash, self._detect_bgr, batch_size)
+
+    def _detect_bgr(self, frames, batch_size):
+        raise NotImplementedError
+
+    def _detect_cached(self, images, hash_fn, detect_fn, batch_size):
+        """Haal bekende beelden uit de result cache, alleen de rest gaat door het model"""
+        if self.result_cache is None:
+            return detect_fn(images, batch_size)
+
+        keys = [DetectionCache.make_key(hash_fn(image), self.name, self.confidence_threshold)
+                for image in images]
+        results = self.result_cache.get_many(keys)
+
+        # Identieke beelden binnen één aanroep (statische camera) maar één keer door het model
+        misses = {}
+        for i, result in enumerate(results):
+            if result is None:
+                misses.setdefault(keys[i], i)
+        if misses:
+            fresh = dict(zip(misses, detect_fn([images[i] for i in misses.values()], batch_size)))
+            self.result_cache.put_many(fresh.items())
+            results = [fresh[key] if result is None else result for key, result in zip(keys, results)]
+        return results
+
+
+def create_detector(name, confidence_threshold=None, result_cache=None, result_cache_size=10000,
+                    onnx_model=None, **detr_options):
+    """
+    Maak een detector op naam (zie BACKENDS).
+
+    Imports gebeuren pas hier, zodat een ontbrekend framework alleen uitmaakt
+    als die backend gekozen wordt. detr_options (cache_dir, num_threads, ...)
+    gaan naar SimpleObjectDetector (num_threads ook naar ONNX Runtime);
+    onnx_model is de export map voor de onnx backends. confidence_threshold
+    None betekent de default van de backend.
+    """
+    if name in ("detr", "detr-int8"):
+        from TRYME import SimpleObjectDetector
+        detr_options["quantize"] = detr_options.get("quantize", False) or name == "detr-int8"
+        if confidence_threshold is not None:
+            detr_options["confidence_threshold"] = confidence_threshold
+        return SimpleObjectDetector(result_cache=result_cache, result_cache_size=result_cache_size, **detr_options)
+
+    if name in ("onnx", "onnx-opencv"):
+        from onnx_backend import DEFAULT_ONNX_DIR, OnnxDetector
+        detector = OnnxDetector(onnx_model or DEFAULT_ONNX_DIR,
+                                runtime="opencv" if name == "onnx-opencv" else "onnxruntime",
+                                num_threads=detr_options.get("num_threads"))
+    elif name == "opencv":
+        from alternatives import OpenCVObjectDetector
+        detector = OpenCVObjectDetector()
+    elif name == "ultralytics":
+        from alternatives import UltralyticsDetector
+        detector = UltralyticsDetector()
+    elif name == "tensorflow":
+        from alternatives import TensorFlowDetector
+        detector = TensorFlowDetector()
+    elif name == "yolov5":
+        from TRYME_YOLO import YOLOv5Detector
+        detector = YOLOv5Detector()
+    else:
+        raise ValueError(f"Onbekende backend: {name} (kies uit {', '.join(BACKENDS)})")
+
+    if confidence_threshold is not None:
+        detector.confidence_threshold = confidence_threshold
+    detector.use_result_cache(result_cache, result_cache_size)
+    return detector
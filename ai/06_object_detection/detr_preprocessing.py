@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+DETR voor- en nabewerking zonder torch
+======================================
+
+Dezelfde stappen als DetrImageProcessor, maar met alleen NumPy en OpenCV:
+
+- resize (kortste zijde naar shortest_edge, langste zijde hooguit longest_edge)
+- normaliseren, BGR -> RGB, padding rechts/onder plus pixel_mask
+- logits + pred_boxes -> scores, label ids en boxes in pixels
+
+SimpleObjectDetector (TRYME.py) gebruikt de voorbewerking met torch buffers,
+OnnxDetector (onnx_backend.py) gebruikt beide zonder torch of transformers te
+laden.
+"""
+
+import cv2
+import numpy as np
+
+# Classes to exclude (often confused with furniture), unless confidence is very high
+EXCLUDED_LABELS = {"sports ball", "frisbee", "ball"}
+EXCLUDED_MIN_CONFIDENCE = 0.95
+
+
+def detr_resize_size(image_size, size):
+    """
+    Doelgrootte (hoogte, breedte) zoals DetrImageProcessor die kiest: kortste
+    zijde naar shortest_edge, maar de langste zijde nooit boven longest_edge.
+    """
+    def get(key):
+        try:
+            return size[key]
+        except (KeyError, TypeError):
+            return getattr(size, key, None)
+
+    if get("height") and get("width"):
+        return get("height"), get("width")
+
+    height, width = image_size
+    target = get("shortest_edge")
+    max_size = get("longest_edge")
+    raw_size = None
+    if max_size is not None:
+        min_original = float(min(height, width))
+        max_original = float(max(height, width))
+        if max_original / min_original * target > max_size:
+            raw_size = max_size * min_original / max_original
+            target = int(round(raw_size))
+
+    if (height <= width and height == target) or (width <= height and width == target):
+        return height, width
+    if width < height:
+        return int((raw_size or target) * height / width), target
+    return target, int((raw_size or target) * width / height)
+
+
+class DetrPreprocessor:
+    """
+    BGR frames -> pixel_values (N, 3, H, W) en pixel_mask (N, H, W) in bestaande arrays.
+
+    Args:
+        size: dict met shortest_edge/longest_edge (of height/width), zoals processor.size
+        image_mean, image_std, rescale_factor: zoals in de processor config
+    """
+
+    def __init__(self, size, image_mean, image_std, rescale_factor=1 / 255):
+        self.size = size
+        # (x * rescale - mean) / std  ==  x * scale - offset, per kanaal
+        mean = np.asarray(image_mean, dtype=np.float32)
+        std = np.asarray(image_std, dtype=np.float32)
+        self.scale = np.float32(rescale_factor) / std
+        self.offset = mean / std
+        self._resize_buffers = {}
+
+    @classmethod
+    def from_processor(cls, processor):
+        return cls(processor.size, processor.image_mean, processor.image_std, processor.rescale_factor)
+
+    def target_sizes(self, frames):
+        """Geresizede (hoogte, breedte) per frame en de vorm van de gepadde batch"""
+        target_sizes = [detr_resize_size(frame.shape[:2], self.size) for frame in frames]
+        height = max(h for h, _ in target_sizes)
+        width = max(w for _, w in target_sizes)
+        return target_sizes, (len(frames), 3, height, width)
+
+    def fill(self, frames, target_sizes, values, mask):
+        """Schrijf de genormaliseerde frames in values (float32) en de echte pixels in mask"""
+        mask[:] = 0
+        for i, (frame, (h, w)) in enumerate(zip(frames, target_sizes)):
+            resized = self._resize_frame(frame, h, w)
+
+            # BGR -> RGB door de kanalen omgekeerd te lezen, zonder kopie
+            for channel in range(3):
+                out = values[i, channel, :h, :w]
+                np.multiply(resized[:, :, 2 - channel], self.scale[channel], out=out, casting="unsafe")
+                out -= self.offset[channel]
+
+            # Padding rechts/onder is 0, de mask geeft aan welke pixels echt zijn
+            values[i, :, h:, :] = 0
+            values[i, :, :h, w:] = 0
+            mask[i, :h, :w] = 1
+
+    def _resize_frame(self, frame, height, width):
+        """Resize naar (height, width) in een hergebruikte uint8 buffer"""
+        if frame.shape[:2] == (height, width):
+            return frame
+
+        buffer = self._resize_buffers.get((height, width))
+        if buffer is None:
+            buffer = np.empty((height, width, 3), dtype=np.uint8)
+            self._resize_buffers[(height, width)] = buffer
+
+        # INTER_AREA bij verkleinen benadert de anti-aliasing van PIL's bilinear resize
+        interpolation = cv2.INTER_AREA if height < frame.shape[0] else cv2.INTER_LINEAR
+        return cv2.resize(frame, (width, height), dst=buffer, interpolation=interpolation)
+
+
+def post_process(logits, pred_boxes, sizes, threshold):
+    """
+    Zoals processor.post_process_object_detection, op NumPy arrays.
+
+    Args:
+        logits: (N, queries, classes + 1), de laatste klasse is "geen object"
+        pred_boxes: (N, queries, 4) genormaliseerd [cx, cy, w, h]
+        sizes: originele (hoogte, breedte) per frame
+
+    Returns:
+        lijst (scores, label_ids, boxes) per frame, boxes als [x1, y1, x2, y2] in pixels
+    """
+    # Softmax over de klassen, numeriek stabiel
+    probabilities = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    probabilities /= probabilities.sum(axis=-1, keepdims=True)
+    probabilities = probabilities[..., :-1]
+    label_ids = probabilities.argmax(axis=-1)
+    scores = np.take_along_axis(probabilities, label_ids[..., None], axis=-1)[..., 0]
+
+    cx, cy, w, h = np.moveaxis(pred_boxes, -1, 0)
+    boxes = np.stack([cx - 0.5 * w, cy - 0.5 * h, cx + 0.5 * w, cy + 0.5 * h], axis=-1)
+
+    results = []
+    for i, (height, width) in enumerate(sizes):
+        keep = scores[i] > threshold
+        scaled = boxes[i][keep] * np.array([width, height, width, height], dtype=np.float32)
+        results.append((scores[i][keep], label_ids[i][keep], scaled))
+    return results
+
+
+def excluded_label_ids(id2label):
+    """Label ids van EXCLUDED_LABELS in een id -> naam mapping"""
+    return np.array([int(i) for i, name in id2label.items() if name.lower() in EXCLUDED_LABELS], dtype=np.int64)
+
+
+def keep_detections(scores, label_ids, excluded_ids):
+    """Masker: uitgesloten klassen alleen met een heel hoge confidence"""
+    return ~np.isin(label_ids, excluded_ids) | (scores >= EXCLUDED_MIN_CONFIDENCE)
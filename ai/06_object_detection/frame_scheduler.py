@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Frame Schedulers
+================
+
+Bepalen welke frames naar het (dure) model gaan.
+
+- FixedIntervalScheduler: elke N-de frame, zoals het vroegere `frame_count % 3 == 0`
+- AdaptiveFrameScheduler: meet de inference tijd en kiest het interval zo dat
+  een doel-FPS (bijv. real-time) gehaald wordt. Op een snelle machine wordt
+  elk frame gedetecteerd, op een trage CPU steeds minder.
+
+Beide hebben dezelfde interface: should_detect(frame_index) en
+record_latency(seconds, frames).
+
+Daarnaast filtert SceneChangeGate keyframes waarop niets veranderd is
+(statische camera): die hergebruiken de vorige detecties.
+"""
+
+from collections import deque
+import math
+
+import cv2
+import numpy as np
+
+
+class FixedIntervalScheduler:
+    """Detecteer elke `interval`-de frame"""
+
+    def __init__(self, interval=3):
+        self.interval = max(1, int(interval))
+
+    def should_detect(self, frame_index):
+        return frame_index % self.interval == 0
+
+    def record_latency(self, seconds, frames=1):
+        """Vaste interval: metingen worden genegeerd"""
+        pass
+
+    def describe(self):
+        return f"elke {self.interval}e frame"
+
+
+class AdaptiveFrameScheduler:
+    """
+    Kiest het detectie-interval op basis van de gemeten inference tijd.
+
+    Args:
+        target_fps: aantal frames per seconde dat verwerkt moet worden
+                    (de FPS van de video/camera = real-time)
+        window: aantal metingen voor het voortschrijdend gemiddelde
+        headroom: deel van het frame-budget dat naar inference mag,
+                  de rest is voor decode, tekenen en encode
+        max_interval: detecteer minstens elke max_interval frames
+    """
+
+    def __init__(self, target_fps, window=10, headroom=0.8, max_interval=30):
+        self.target_fps = target_fps
+        self.headroom = headroom
+        self.max_interval = max_interval
+        self.latencies = deque(maxlen=window)
+        self.interval = 1
+        self.last_keyframe = None
+
+    def record_latency(self, seconds, frames=1):
+        """Registreer hoe lang `frames` detecties samen duurden"""
+        if frames <= 0:
+            return
+        self.latencies.append(seconds / frames)
+
+        # Benodigd interval: inference tijd per keyframe gedeeld door het budget per frame
+        frame_budget = self.headroom / self.target_fps
+        needed = math.ceil(self.average_latency / frame_budget)
+        self.interval = min(self.max_interval, max(1, needed))
+
+    @property
+    def average_latency(self):
+        return sum(self.latencies) / len(self.latencies) if self.latencies else 0.0
+
+    def should_detect(self, frame_index):
+        if self.last_keyframe is None or frame_index - self.last_keyframe >= self.interval:
+            self.last_keyframe = frame_index
+            return True
+        return False
+
+    def describe(self):
+        return (f"adaptief, doel {self.target_fps:.1f} FPS: elke {self.interval}e frame "
+                f"(inference {self.average_latency * 1000:.0f} ms/frame)")
+
+
+class SceneChangeGate:
+    """
+    Goedkope check of een frame genoeg verschilt van het laatst gedetecteerde frame.
+
+    Elk frame wordt verkleind tot een grijs thumbnail van size pixels. Een
+    thumbnail pixel telt als veranderd als de grijswaarde meer dan pixel_delta
+    afwijkt van het referentie frame; een klein object dat het beeld
+    binnenloopt verandert zo al een paar pixels, waar een gemiddelde over het
+    hele beeld het zou missen. De referentie verschuift alleen als er echt
+    gedetecteerd wordt, zodat langzame veranderingen zich opstapelen.
+
+    Args:
+        threshold: minimaal percentage veranderde thumbnail pixels om opnieuw te detecteren
+        pixel_delta: grijswaarde verschil (0-255) waarboven een pixel als veranderd telt,
+                     boven de ruis van sensor en compressie
+        size: (breedte, hoogte) van het thumbnail
+    """
+
+    def __init__(self, threshold=0.5, pixel_delta=12, size=(64, 48)):
+        self.threshold = threshold
+        self.pixel_delta = pixel_delta
+        self.size = size
+        self.reference = None
+        self.checked = 0
+        self.skipped = 0
+
+    def signature(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        return cv2.resize(gray, self.size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def changed(self, frame):
+        """True als het frame naar het model moet (en wordt dan de nieuwe referentie)"""
+        self.checked += 1
+        signature = self.signature(frame)
+        if self.reference is not None:
+            changed_percent = (np.abs(signature - self.reference) > self.pixel_delta).mean() * 100
+            if changed_percent <= self.threshold:
+                self.skipped += 1
+                return False
+        self.reference = signature
+        return True
+
+    def describe(self):
+        return (f"{self.skipped} van {self.checked} inferences bespaard "
+                f"(drempel {self.threshold:g}% veranderd)")
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Batch detectie over veel afbeeldingen
+=====================================
+
+Verwerkt een map of glob patroon (bijv. "fotos/**/*.jpg") in één run:
+
+- afbeeldingen worden in een thread pool gedecodeerd, een paar batches vooruit
+- de detector krijgt ze per batch (detect_frames, geen PIL)
+- alle detecties komen in één JSON Lines bestand, één regel per afbeelding:
+
+    {"image": "fotos/a.jpg", "width": 640, "height": 480, "detections": [...]}
+
+Het resultaten bestand is ook het manifest: met resume=True worden
+afbeeldingen die er al in staan overgeslagen en wordt het bestand aangevuld.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import glob
+from itertools import islice
+import json
+import os
+from pathlib import Path
+import time
+
+import cv2
+
+from detection_results import detection_to_dict
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+
+
+def is_batch_input(source):
+    """Een map of een glob patroon (in plaats van één bestand)"""
+    # Een bestaand bestand is nooit een patroon, ook niet met [ of ? in de naam (clip[1].mp4)
+    if Path(source).is_file():
+        return False
+    return Path(source).is_dir() or any(c in str(source) for c in "*?[")
+
+
+def find_images(source):
+    """Alle afbeeldingen in een map (recursief) of die bij een glob patroon passen, gesorteerd"""
+    if Path(source).is_dir():
+        paths = (str(p) for p in Path(source).rglob("*"))
+    else:
+        paths = glob.iglob(str(source), recursive=True)
+    return sorted(p for p in paths if Path(p).suffix.lower() in IMAGE_EXTENSIONS)
+
+
+def load_manifest(results_path):
+    """
+    Lees welke afbeeldingen al in het resultaten bestand staan.
+
+    Een half geschreven laatste regel (afgebroken run) wordt weggeknipt,
+    zodat er veilig aan het bestand toegevoegd kan worden.
+    """
+    done = set()
+    if not os.path.exists(results_path):
+        return done
+
+    with open(results_path, "rb+") as f:
+        valid_end = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                done.add(json.loads(line)["image"])
+            except (ValueError, KeyError):
+                break
+            valid_end += len(line)
+        f.truncate(valid_end)
+    return done
+
+
+def _decode(path):
+    return cv2.imread(path, cv2.IMREAD_COLOR)
+
+
+def process_image_batch(source, detector, results_path, batch_size=8, decode_threads=4,
+                        resume=False, prefetch=2):
+    """
+    Detecteer objecten in alle afbeeldingen van een map of glob patroon.
+
+    Args:
+        detector: een Detector (detectors.py), elke backend werkt
+        results_path: JSON Lines bestand met één regel per afbeelding
+        decode_threads: aantal threads dat afbeeldingen inleest
+        resume: sla afbeeldingen over die al in results_path staan
+        prefetch: aantal batches dat vooruit gedecodeerd wordt
+
+    Returns:
+        dict met aantallen en images/sec
+    """
+    paths = find_images(source)
+    done = load_manifest(results_path) if resume else set()
+    todo = [p for p in paths if p not in done]
+
+    print(f"🗂️  {len(paths)} afbeeldingen gevonden, {len(paths) - len(todo)} al verwerkt, {len(todo)} te gaan")
+    if not todo:
+        return {"images": 0, "skipped": len(paths), "failed": 0, "images_per_sec": 0.0}
+
+    batches = [todo[i:i + batch_size] for i in range(0, len(todo), batch_size)]
+    processed = failed = batches_done = 0
+    detect_time = 0.0
+    start_time = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=decode_threads) as pool, \
+            open(results_path, "a" if resume else "w", encoding="utf-8") as results_file:
+
+        def submit(batch):
+            return batch, [pool.submit(_decode, path) for path in batch]
+
+        # Een paar batches vooruit decoderen terwijl het model bezig is
+        batch_iter = iter(batches)
+        pending = deque(submit(batch) for batch in islice(batch_iter, prefetch))
+
+        while pending:
+            batch, futures = pending.popleft()
+            next_batch = next(batch_iter, None)
+            if next_batch is not None:
+                pending.append(submit(next_batch))
+
+            images = [future.result() for future in futures]
+            readable = [(path, image) for path, image in zip(batch, images) if image is not None]
+
+            detect_start = time.perf_counter()
+            detections = detector.detect_frames([image for _, image in readable], batch_size) if readable else []
+            detect_time += time.perf_counter() - detect_start
+
+            results = {path: (image, dets) for (path, image), dets in zip(readable, detections)}
+            for path in batch:
+                if path in results:
+                    image, image_detections = results[path]
+                    record = {
+                        "image": path,
+                        "width": image.shape[1],
+                        "height": image.shape[0],
+                        "detections": [detection_to_dict(d) for d in image_detections],
+                    }
+                else:
+                    # Ook in het manifest, zodat resume het niet steeds opnieuw probeert
+                    record = {"image": path, "error": "kan afbeelding niet lezen"}
+                    failed += 1
+                results_file.write(json.dumps(record) + "\n")
+
+            # Per batch naar schijf: bij een crash gaat hooguit één batch verloren
+            results_file.flush()
+            processed += len(batch)
+            batches_done += 1
+            if batches_done % 25 == 0:
+                elapsed = time.perf_counter() - start_time
+                print(f"🔄 {processed}/{len(todo)} afbeeldingen ({processed / elapsed:.1f} img/s)")
+
+    elapsed = time.perf_counter() - start_time
+    images_per_sec = processed / elapsed
+    print(f"✅ {processed} afbeeldingen in {elapsed:.1f}s: {images_per_sec:.1f} images/sec "
+          f"(detectie {detect_time:.1f}s, {failed} onleesbaar)")
+    print(f"📝 Detecties opgeslagen: {results_path}")
+    return {
+        "images": processed,
+        "skipped": len(paths) - len(todo),
+        "failed": failed,
+        "images_per_sec": images_per_sec,
+    }
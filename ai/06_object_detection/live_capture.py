@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Live capture met "laatste frame" semantiek
+==========================================
+
+cv2.VideoCapture buffert frames. Als de detectie langzamer is dan de camera,
+loopt die buffer vol en verwerken we steeds oudere frames: de vertraging
+groeit. Daarom drie losse onderdelen:
+
+    capture thread     leest continu en bewaart alleen het nieuwste frame
+    inference thread   detecteert op het nieuwste frame zodra het model vrij is
+    main thread        toont/schrijft frames met de laatst bekende detecties
+
+Frames die niemand meer ophaalt vallen weg (geteld als "overgeslagen"). Elk
+detectie resultaat krijgt het moment waarop het frame binnenkwam en de
+glass-to-detection latency: de tijd van binnenkomen tot detecties klaar.
+
+    capture = LatestFrameCapture(0)                # webcam index of "rtsp://..."
+    live = LiveDetector(detector, capture)
+    live.start()
+    ...
+    result = live.latest()                         # LiveResult of None
+    live.stop(); capture.close()
+"""
+
+from collections import deque, namedtuple
+import threading
+import time
+
+import cv2
+import numpy as np
+
+# index: volgnummer vanaf de capture start; wall_time: time.time() bij binnenkomst
+# (voor logs); timestamp: time.perf_counter() bij binnenkomst (voor de latency)
+CapturedFrame = namedtuple("CapturedFrame", ["index", "image", "wall_time", "timestamp"])
+
+# Detecties van één frame, met hoe oud dat frame was toen ze klaar waren
+LiveResult = namedtuple("LiveResult", ["frame_index", "detections", "wall_time", "latency", "inference_time"])
+
+
+def is_live_source(source):
+    """'webcam', een camera index ("0") of een stream URL (rtsp://, http://)"""
+    source = str(source)
+    return source.lower() == "webcam" or source.isdigit() or "://" in source
+
+
+def open_source(source):
+    """cv2.VideoCapture voor 'webcam' (index 0), een camera index of een URL"""
+    source = str(source)
+    if source.lower() == "webcam":
+        source = 0
+    elif source.isdigit():
+        source = int(source)
+    return cv2.VideoCapture(source)
+
+
+class LatestFrameCapture:
+    """
+    Leest frames in een eigen thread en bewaart alleen het nieuwste.
+
+    Args:
+        source: camera index, 'webcam', URL of een geopende cv2.VideoCapture
+    """
+
+    def __init__(self, source=0):
+        self.cap = source if isinstance(source, cv2.VideoCapture) else open_source(source)
+        # Zo min mogelijk frames in de buffer van de driver (niet elke backend ondersteunt het)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.frames_read = 0
+        self.latest_frame = None
+        self.stopped = False
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self._run, name="capture", daemon=True)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _run(self):
+        index = 0
+        try:
+            while not self.stopped:
+                ret, image = self.cap.read()
+                if not ret:
+                    break
+                captured = CapturedFrame(index, image, time.time(), time.perf_counter())
+                with self.condition:
+                    self.latest_frame = captured
+                    self.frames_read += 1
+                    self.condition.notify_all()
+                index += 1
+        finally:
+            with self.condition:
+                self.stopped = True
+                self.condition.notify_all()
+
+    def read(self, after=-1, timeout=None):
+        """
+        Het nieuwste frame met index > after; wacht tot dat er is.
+
+        Returns:
+            CapturedFrame, of None als de stream klaar is (of na timeout)
+        """
+        with self.condition:
+            self.condition.wait_for(
+                lambda: self.stopped or (self.latest_frame is not None and self.latest_frame.index > after),
+                timeout,
+            )
+            if self.latest_frame is not None and self.latest_frame.index > after:
+                return self.latest_frame
+            return None
+
+    def close(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+        if self.thread.is_alive():
+            self.thread.join(timeout=2)
+        self.cap.release()
+
+
+class LatencyStats:
+    """Latencies van de laatste `window` detecties, voor p50/p95 zonder groeiend geheugen"""
+
+    def __init__(self, window=1000):
+        self.values = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, seconds):
+        self.values.append(seconds)
+        self.count += 1
+
+    def describe(self):
+        if not self.values:
+            return "geen detecties"
+        p50, p95 = np.percentile(self.values, [50, 95]) * 1000
+        return f"p50 {p50:.0f}ms, p95 {p95:.0f}ms, max {max(self.values) * 1000:.0f}ms (laatste {len(self.values)})"
+
+
+class LiveDetector:
+    """
+    Detecteert in een eigen thread steeds op het nieuwste frame van een LatestFrameCapture.
+
+    Args:
+        detector: een Detector (detectors.py)
+        gate: optionele SceneChangeGate; onveranderde frames hergebruiken het vorige resultaat
+        max_fps: maximaal aantal detecties per seconde (None = zo snel als het model kan)
+        results_writer: optionele JsonlResultsWriter; elke regel krijgt captured_at en latency_ms
+    """
+
+    def __init__(self, detector, capture, gate=None, max_fps=None, results_writer=None):
+        self.detector = detector
+        self.capture = capture
+        self.gate = gate
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.results_writer = results_writer
+        self.latency = LatencyStats()
+        self.detections_done = 0
+        self.frames_skipped = 0
+        self.error = None
+        self._latest = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="inference", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def latest(self):
+        with self._lock:
+            return self._latest
+
+    def _run(self):
+        last_index = -1
+        try:
+            while not self._stop.is_set():
+                loop_start = time.perf_counter()
+                captured = self.capture.read(after=last_index, timeout=0.5)
+                if captured is None:
+                    if self.capture.stopped:
+                        break
+                    continue
+                # Alles tussen het vorige en dit frame is nooit door het model gegaan
+                self.frames_skipped += max(0, captured.index - last_index - 1)
+                last_index = captured.index
+
+                if self.gate is not None and not self.gate.changed(captured.image):
+                    continue
+
+                detect_start = time.perf_counter()
+                detections = self.detector.detect_frames([captured.image])[0]
+                done = time.perf_counter()
+                result = LiveResult(captured.index, detections, captured.wall_time,
+                                    done - captured.timestamp, done - detect_start)
+                with self._lock:
+                    self._latest = result
+                self.latency.add(result.latency)
+                self.detections_done += 1
+
+                if self.results_writer:
+                    self.results_writer.write(captured.index, detections, extra={
+                        "captured_at": round(captured.wall_time, 3),
+                        "latency_ms": round(result.latency * 1000, 1),
+                    })
+
+                if self.min_interval:
+                    remaining = self.min_interval - (time.perf_counter() - loop_start)
+                    if remaining > 0:
+                        self._stop.wait(remaining)
+        except Exception as e:
+            self.error = e
+
+    def stop(self):
+        """Stop de thread; een fout uit de inference thread wordt hier opnieuw opgegooid"""
+        self._stop.set()
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def describe(self):
+        return (f"{self.detections_done} detecties, {self.frames_skipped} frames overgeslagen, "
+                f"glass-to-detection latency {self.latency.describe()}")
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+DETR via ONNX
+=============
+
+Exporteer het DETR model één keer naar ONNX (offline, uit de lokale model
+cache) en draai het daarna met ONNX Runtime of cv2.dnn. Torch en
+transformers worden dan niet geïmporteerd: sneller opstarten en een veel
+kleiner proces.
+
+    python TRYME.py --export-onnx
+    python TRYME.py --input video.mp4 --backend onnx          # ONNX Runtime
+    python TRYME.py --input video.mp4 --backend onnx-opencv   # cv2.dnn (OpenCV 5)
+
+De export map bevat model.onnx en detr.json (labels en voorbewerking), dus
+ook de DetrImageProcessor is niet meer nodig. Voor- en nabewerking zijn
+dezelfde als in TRYME.py (detr_preprocessing.py).
+"""
+
+import json
+import os
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from detection_results import Detections
+from detectors import Detector
+from detr_preprocessing import DetrPreprocessor, excluded_label_ids, keep_detections, post_process
+
+DEFAULT_ONNX_DIR = os.environ.get(
+    "DETECTION_ONNX_MODEL", os.path.join(Path.home(), ".cache", "object_detection", "facebook--detr-resnet-50-onnx")
+)
+
+
+def _size_dict(size):
+    """processor.size (dict of SizeDict) -> gewone dict voor JSON"""
+    keys = ("shortest_edge", "longest_edge", "height", "width")
+    get = size.get if isinstance(size, dict) else lambda key: getattr(size, key, None)
+    return {key: get(key) for key in keys if get(key) is not None}
+
+
+def export_onnx(processor, model, output_dir=DEFAULT_ONNX_DIR, model_name="facebook/detr-resnet-50", opset=17):
+    """
+    Schrijf model.onnx en detr.json naar output_dir.
+
+    Batch, hoogte en breedte zijn dynamisch, zodat elke video resolutie en
+    batch grootte werkt. Na de export wordt de ONNX output één keer met de
+    PyTorch output vergeleken (als onnxruntime geïnstalleerd is).
+
+    Args:
+        processor, model: zoals SimpleObjectDetector._load_pretrained ze teruggeeft
+    """
+    import torch
+
+    class DetrOutputs(torch.nn.Module):
+        """Alleen de tensors die de nabewerking nodig heeft"""
+
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, pixel_values, pixel_mask):
+            outputs = self.model(pixel_values=pixel_values, pixel_mask=pixel_mask)
+            return outputs.logits, outputs.pred_boxes
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    onnx_path = output_dir / "model.onnx"
+
+    # Voorbeeld input: één 4:3 frame na de DETR resize; de vorm zelf is dynamisch
+    wrapper = DetrOutputs(model).eval()
+    pixel_values = torch.randn(1, 3, 800, 1066)
+    pixel_mask = torch.ones(1, 800, 1066, dtype=torch.long)
+
+    print(f"📦 ONNX export: {model_name} -> {onnx_path}")
+    with torch.inference_mode():
+        torch.onnx.export(
+            wrapper, (pixel_values, pixel_mask), str(onnx_path),
+            input_names=["pixel_values", "pixel_mask"],
+            output_names=["logits", "pred_boxes"],
+            dynamic_axes={
+                "pixel_values": {0: "batch", 2: "height", 3: "width"},
+                "pixel_mask": {0: "batch", 1: "height", 2: "width"},
+                "logits": {0: "batch"},
+                "pred_boxes": {0: "batch"},
+            },
+            opset_version=opset,
+            dynamo=False,
+        )
+
+    config = {
+        "model_name": model_name,
+        "id2label": {str(i): label for i, label in model.config.id2label.items()},
+        "size": _size_dict(processor.size),
+        "image_mean": list(processor.image_mean),
+        "image_std": list(processor.image_std),
+        "rescale_factor": processor.rescale_factor,
+    }
+    (output_dir / "detr.json").write_text(json.dumps(config, indent=2))
+
+    try:
+        import onnxruntime
+    except ImportError:
+        print("⚠️  onnxruntime niet geïnstalleerd, export niet gecontroleerd (pip install onnxruntime)")
+    else:
+        session = onnxruntime.InferenceSession(str(onnx_path), providers=["CPUExecutionProvider"])
+        logits, _ = session.run(None, {"pixel_values": pixel_values.numpy(), "pixel_mask": pixel_mask.numpy()})
+        with torch.inference_mode():
+            expected, _ = wrapper(pixel_values, pixel_mask)
+        print(f"🔍 Max verschil met PyTorch (logits): {np.abs(logits - expected.numpy()).max():.2e}")
+
+    size_mb = onnx_path.stat().st_size / 1024 / 1024
+    print(f"✅ ONNX model opgeslagen: {onnx_path} ({size_mb:.1f} MB)")
+    return onnx_path
+
+
+class OnnxDetector(Detector):
+    """
+    Een geëxporteerd DETR model met ONNX Runtime of cv2.dnn.
+
+    Args:
+        model_dir: map van export_onnx (model.onnx + detr.json)
+        runtime: "onnxruntime" of "opencv" (cv2.dnn)
+        num_threads: aantal threads per operatie (alleen ONNX Runtime)
+    """
+
+    def __init__(self, model_dir=DEFAULT_ONNX_DIR, confidence_threshold=0.8, runtime="onnxruntime",
+                 num_threads=None):
+        model_dir = Path(model_dir)
+        self.confidence_threshold = confidence_threshold
+        self.runtime = runtime
+        self.session = None
+        self.net = None
+        self._buffers = None
+
+        if not (model_dir / "model.onnx").exists():
+            print(f"⚠️  ONNX model niet gevonden in {model_dir}. Maak het met: python TRYME.py --export-onnx")
+            self.name = "onnx"
+            self.id2label = {}
+            return
+
+        config = json.loads((model_dir / "detr.json").read_text())
+        self.name = f"{config['model_name']}-onnx"
+        self.id2label = {int(i): label for i, label in config["id2label"].items()}
+        self._excluded_ids = excluded_label_ids(self.id2label)
+        self._preprocessor = DetrPreprocessor(config["size"], config["image_mean"], config["image_std"],
+                                              config["rescale_factor"])
+
+        if runtime == "onnxruntime":
+            try:
+                import onnxruntime
+            except ImportError:
+                print("❌ ONNX Runtime not installed. Run: pip install onnxruntime")
+                return
+            options = onnxruntime.SessionOptions()
+            if num_threads:
+                options.intra_op_num_threads = num_threads
+            # GPU als die er is, anders CPU
+            providers = [p for p in ("CUDAExecutionProvider", "CPUExecutionProvider")
+                         if p in onnxruntime.get_available_providers()]
+            self.session = onnxruntime.InferenceSession(str(model_dir / "model.onnx"), options, providers=providers)
+            providers = ", ".join(self.session.get_providers())
+        elif runtime == "opencv":
+            self.net = cv2.dnn.readNetFromONNX(str(model_dir / "model.onnx"))
+            providers = f"OpenCV {cv2.__version__}"
+        else:
+            raise ValueError(f"Onbekende runtime: {runtime} (kies onnxruntime of opencv)")
+
+        print(f"✅ ONNX model geladen: {model_dir / 'model.onnx'} ({providers})")
+
+    @property
+    def available(self):
+        return self.session is not None or self.net is not None
+
+    def _detect_bgr(self, frames, batch_size):
+        if not self.available:
+            return [Detections.empty(self.id2label) for _ in frames]
+
+        all_detections = []
+        for start in range(0, len(frames), batch_size):
+            batch = frames[start:start + batch_size]
+
+            # Zelfde voorbewerking als SimpleObjectDetector, in hergebruikte NumPy buffers
+            target_sizes, shape = self._preprocessor.target_sizes(batch)
+            if self._buffers is None or self._buffers[0].shape != shape:
+                self._buffers = (np.empty(shape, dtype=np.float32),
+                                 np.empty((shape[0],) + shape[2:], dtype=np.int64))
+            pixel_values, pixel_mask = self._buffers
+            self._preprocessor.fill(batch, target_sizes, pixel_values, pixel_mask)
+
+            logits, pred_boxes = self._run(pixel_values, pixel_mask)
+
+            sizes = [frame.shape[:2] for frame in batch]
+            for scores, label_ids, boxes in post_process(logits, pred_boxes, sizes, self.confidence_threshold):
+                # Skip excluded classes unless confidence is very high
+                keep = keep_detections(scores, label_ids, self._excluded_ids)
+                all_detections.append(Detections(boxes[keep], scores[keep], label_ids[keep], self.id2label))
+
+        return all_detections
+
+    def _run(self, pixel_values, pixel_mask):
+        """Eén forward pass: (logits, pred_boxes) als NumPy arrays"""
+        if self.session is not None:
+            return self.session.run(["logits", "pred_boxes"],
+                                    {"pixel_values": pixel_values, "pixel_mask": pixel_mask})
+        self.net.setInput(pixel_values, "pixel_values")
+        self.net.setInput(pixel_mask, "pixel_mask")
+        return self.net.forward(["logits", "pred_boxes"])
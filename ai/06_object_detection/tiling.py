@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Detectie in tiles
+=================
+
+Een detector verkleint het hele beeld naar zijn eigen input grootte (DETR:
+kortste zijde 800, OpenCV YOLO: 416x416). Op een 4K frame blijft er van een
+klein object dan bijna niets over. TiledDetector knipt het beeld in
+overlappende tiles, stuurt alle tiles samen door de gebatchte detect_frames
+en voegt de boxes weer samen:
+
+- een box die een binnenrand van zijn tile raakt is afgesneden; die valt weg,
+  de buurtile (overlap) of de pass over het hele beeld ziet het object heel
+- dubbele boxes in de overlap verdwijnen met NMS per klasse
+- objecten groter dan een tile komen uit één extra pass over het hele beeld
+
+Met een ROI masker (wit = hier kunnen objecten staan) gaan alleen tiles met
+ROI pixels door het model, en tellen alleen boxes met hun midden in de ROI.
+Zonder tile grootte is de ROI alleen een uitsnede: het model ziet dan alleen
+het omsluitende rechthoek van de ROI, op hogere resolutie.
+
+    detector = TiledDetector(detector, tile_size=640, overlap=0.2, roi_mask="roi.png")
+"""
+
+import math
+
+import cv2
+import numpy as np
+
+from detection_results import Detections
+from detectors import Detector
+
+
+def tile_grid(x0, y0, x1, y1, tile_size, overlap):
+    """
+    Overlappende tiles (x0, y0, x1, y1) die de rechthoek precies bedekken.
+
+    De laatste tile per rij/kolom ligt tegen de rand, zodat alle tiles even
+    groot zijn (één batch vorm voor het model).
+    """
+    def starts(start, end):
+        length = end - start
+        if length <= tile_size:
+            return [start]
+        stride = max(1, int(tile_size * (1 - overlap)))
+        count = math.ceil((length - tile_size) / stride) + 1
+        return [min(start + i * stride, end - tile_size) for i in range(count)]
+
+    size_x = min(tile_size, x1 - x0)
+    size_y = min(tile_size, y1 - y0)
+    return [(tx, ty, tx + size_x, ty + size_y) for ty in starts(y0, y1) for tx in starts(x0, x1)]
+
+
+def class_aware_nms(detections, iou_threshold=0.5):
+    """Non-maximum suppression binnen elke klasse (boxes van verschillende klassen blijven staan)"""
+    if len(detections) < 2:
+        return detections
+    boxes = detections.boxes.astype(np.float32)
+    # Elke klasse naar een eigen stuk van het vlak schuiven, dan overlappen alleen boxes van dezelfde klasse
+    offset = (boxes.max() + 1) * detections.label_ids.astype(np.float32)[:, None]
+    shifted = boxes + offset
+    xywh = np.concatenate([shifted[:, :2], shifted[:, 2:] - shifted[:, :2]], axis=1)
+    keep = cv2.dnn.NMSBoxes(xywh.tolist(), detections.scores.tolist(), 0.0, iou_threshold)
+    return detections[np.asarray(keep, dtype=int).reshape(-1)]
+
+
+def load_roi_mask(roi_mask):
+    """Pad naar een afbeelding of een array -> bool masker (True = ROI)"""
+    if isinstance(roi_mask, np.ndarray):
+        mask = roi_mask
+    else:
+        mask = cv2.imread(str(roi_mask), cv2.IMREAD_GRAYSCALE)
+        if mask is None:
+            raise ValueError(f"Kan ROI masker niet lezen: {roi_mask}")
+    if mask.ndim == 3:
+        mask = mask.max(axis=2)
+    return mask > 0
+
+
+class TiledDetector(Detector):
+    """
+    Detecteert in overlappende tiles met een andere detector.
+
+    Args:
+        detector: de Detector die de tiles verwerkt
+        tile_size: zijde van een tile in pixels (None = geen tiles, alleen ROI uitsnede)
+        overlap: overlap tussen buurtiles als fractie van tile_size; minstens zo groot
+                 als de kleine objecten die je zoekt
+        roi_mask: pad of array, wit = ROI; wordt naar de frame grootte geschaald
+        full_frame: ook één pass over het hele beeld (ROI rechthoek), voor objecten groter dan een tile
+        nms_iou: IoU drempel voor NMS over de samengevoegde boxes
+    """
+
+    def __init__(self, detector, tile_size=640, overlap=0.2, roi_mask=None, full_frame=True, nms_iou=0.5):
+        self.detector = detector
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.full_frame = full_frame
+        self.nms_iou = nms_iou
+        self.roi_mask = load_roi_mask(roi_mask) if roi_mask is not None else None
+        self._layouts = {}
+        self.frames = 0
+        self.tiles_run = 0
+        self.tiles_skipped = 0
+
+        tiling = f"tiles{tile_size}x{overlap:g}" if tile_size else "roi"
+        self.name = f"{detector.name}-{tiling}"
+
+    @property
+    def confidence_threshold(self):
+        return self.detector.confidence_threshold
+
+    @confidence_threshold.setter
+    def confidence_threshold(self, value):
+        self.detector.confidence_threshold = value
+
+    @property
+    def available(self):
+        return self.detector.available
+
+    # De result cache zit op de binnenste detector en werkt per tile: zo
+    # blijft hij geldig als de tile grootte of de ROI verandert
+    @property
+    def result_cache(self):
+        return self.detector.result_cache
+
+    def use_result_cache(self, result_cache, max_entries=10000):
+        self.detector.use_result_cache(result_cache, max_entries)
+
+    def detect_frames(self, frames, batch_size=8):
+        return self._detect_bgr(frames, batch_size)
+
+    def layout(self, height, width):
+        """
+        (tiles, region, masker, overgeslagen) voor een frame grootte; één keer berekend per grootte.
+
+        region is de omsluitende rechthoek van de ROI (of het hele frame),
+        tiles zijn de tiles met minstens één ROI pixel (leeg als de rechthoek in één tile past).
+        """
+        key = (height, width)
+        if key in self._layouts:
+            return self._layouts[key]
+
+        mask = None
+        region = (0, 0, width, height)
+        if self.roi_mask is not None:
+            mask = self.roi_mask
+            if mask.shape != (height, width):
+                mask = cv2.resize(mask.astype(np.uint8), (width, height), interpolation=cv2.INTER_NEAREST) > 0
+            ys, xs = np.nonzero(mask)
+            region = (int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1) if len(xs) else None
+
+        tiles = []
+        skipped = 0
+        if region is not None and self.tile_size:
+            for tile in tile_grid(*region, self.tile_size, self.overlap):
+                x0, y0, x1, y1 = tile
+                if mask is not None and not mask[y0:y1, x0:x1].any():
+                    skipped += 1
+                    continue
+                tiles.append(tile)
+        if tiles == [region]:
+            # Eén tile die de hele rechthoek is: dat is precies de pass over het hele beeld, één keer is genoeg
+            tiles = []
+
+        self._layouts[key] = (tiles, region, mask, skipped)
+        print(f"🧩 Tiles voor {width}x{height}: {self.describe(height, width)}")
+        return self._layouts[key]
+
+    def describe(self, height, width):
+        tiles, region, mask, skipped = self.layout(height, width)
+        if region is None:
+            return "ROI masker is leeg, er wordt niets gedetecteerd"
+        parts = []
+        if self.tile_size and tiles:
+            parts.append(f"{len(tiles)} tiles van {self.tile_size}px (overlap {self.overlap:.0%})")
+            if skipped:
+                parts.append(f"{skipped} tiles buiten de ROI overgeslagen")
+        if self.full_frame or not tiles:
+            x0, y0, x1, y1 = region
+            parts.append(f"{'ROI uitsnede' if mask is not None else 'volledig beeld'} {x1 - x0}x{y1 - y0}")
+        if mask is not None:
+            parts.append(f"ROI {mask.mean():.0%} van het beeld")
+        return ", ".join(parts)
+
+    def _detect_bgr(self, frames, batch_size):
+        # Alle tiles van alle frames in één lijst, zodat ze samen gebatcht worden
+        crops = []
+        owners = []
+        whole = []
+        whole_owners = []
+        for i, frame in enumerate(frames):
+            tiles, region, _, skipped = self.layout(*frame.shape[:2])
+            self.frames += 1
+            self.tiles_skipped += skipped
+            if region is None:
+                continue
+            for tile in tiles:
+                x0, y0, x1, y1 = tile
+                crops.append(frame[y0:y1, x0:x1])
+                owners.append((i, tile, True))
+            if self.full_frame or not tiles:
+                x0, y0, x1, y1 = region
+                whole.append(frame[y0:y1, x0:x1])
+                whole_owners.append((i, region, False))
+
+        self.tiles_run += len(crops)
+        # Tiles en hele beelden apart: anders padt DETR de tiles naar de vorm van het hele beeld
+        outputs = self.detector.detect_frames(crops, batch_size) if crops else []
+        outputs += self.detector.detect_frames(whole, batch_size) if whole else []
+
+        per_frame = [[] for _ in frames]
+        for (i, (x0, y0, x1, y1), is_tile), detections in zip(owners + whole_owners, outputs):
+            if not len(detections):
+                continue
+            if is_tile:
+                detections = detections[self._inside_tile(detections.boxes, frames[i].shape, (x0, y0, x1, y1))]
+            # Tile coördinaten -> frame coördinaten
+            per_frame[i].append(Detections(detections.boxes + [x0, y0, x0, y0], detections.scores,
+                                           detections.label_ids, detections.names))
+
+        results = []
+        for frame, parts in zip(frames, per_frame):
+            detections = class_aware_nms(Detections.concatenate(parts), self.nms_iou)
+            _, _, mask, _ = self.layout(*frame.shape[:2])
+            if mask is not None and len(detections):
+                # Alleen objecten met hun midden in de ROI
+                centers = (detections.boxes[:, :2] + detections.boxes[:, 2:]) // 2
+                cx = np.clip(centers[:, 0], 0, mask.shape[1] - 1)
+                cy = np.clip(centers[:, 1], 0, mask.shape[0] - 1)
+                detections = detections[mask[cy, cx]]
+            results.append(detections)
+        return results
+
+    def _inside_tile(self, boxes, frame_shape, tile, margin=2):
+        """
+        Masker: boxes die geen binnenrand van de tile raken.
+
+        Een rand die ook de rand van het frame is telt niet: daar is het object
+        echt afgelopen. Zonder pass over het hele beeld blijft alles staan.
+        """
+        if not self.full_frame:
+            return np.ones(len(boxes), dtype=bool)
+        x0, y0, x1, y1 = tile
+        height, width = frame_shape[:2]
+        keep = np.ones(len(boxes), dtype=bool)
+        if x0 > 0:
+            keep &= boxes[:, 0] > margin
+        if y0 > 0:
+            keep &= boxes[:, 1] > margin
+        if x1 < width:
+            keep &= boxes[:, 2] < (x1 - x0) - margin
+        if y1 < height:
+            keep &= boxes[:, 3] < (y1 - y0) - margin
+        return keep
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Eenvoudige IoU Tracker
+======================
+
+Koppelt detecties van opeenvolgende keyframes aan elkaar op basis van
+overlap (IoU) en geeft elk object een vast track ID. Tussen keyframes
+wordt de box voorspeld met een constante-snelheid model, zodat ook
+overgeslagen frames detecties hebben.
+
+    tracker = IoUTracker()
+    tracked, new_tracks = tracker.update(frame_index, detections)   # keyframe
+    tracked = tracker.predict(frame_index)                          # overgeslagen frame
+
+Veel goedkoper dan DeepSORT/ByteTrack, maar voor een statische camera met
+rustig bewegende objecten goed genoeg.
+"""
+
+import numpy as np
+
+from detection_results import Detections, as_detections
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """IoU tussen elke box in boxes_a (N x 4) en boxes_b (M x 4), formaat [x1, y1, x2, y2]"""
+    boxes_a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+
+    x1 = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    y1 = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    x2 = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+    y2 = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return np.where(union > 0, intersection / np.maximum(union, 1e-6), 0.0)
+
+
+class Track:
+    """Eén gevolgd object: laatste box, snelheid per frame en confidence"""
+
+    def __init__(self, track_id, detection, frame_index):
+        self.track_id = track_id
+        self.label = detection["label"]
+        self.confidence = detection["confidence"]
+        self.box = np.asarray(detection["box"], dtype=np.float32)
+        self.velocity = np.zeros(4, dtype=np.float32)
+        self.last_frame = frame_index
+
+    def predicted_box(self, frame_index):
+        """Box op frame_index volgens het constante-snelheid model"""
+        return self.box + self.velocity * (frame_index - self.last_frame)
+
+    def update(self, detection, frame_index, smoothing=0.5):
+        """Nieuwe waarneming: snelheid bijwerken (exponentieel gemiddelde) en box vervangen"""
+        new_box = np.asarray(detection["box"], dtype=np.float32)
+        frames = frame_index - self.last_frame
+        if frames > 0:
+            measured = (new_box - self.box) / frames
+            self.velocity = smoothing * measured + (1 - smoothing) * self.velocity
+        self.box = new_box
+        self.confidence = detection["confidence"]
+        self.last_frame = frame_index
+
+    def as_detection(self, frame_index):
+        return {
+            "label": self.label,
+            "confidence": self.confidence,
+            "box": self.predicted_box(frame_index).astype(int),
+            "track_id": self.track_id,
+        }
+
+
+class IoUTracker:
+    """
+    Greedy IoU-koppeling per klasse met constante-snelheid voorspelling.
+
+    Args:
+        iou_threshold: minimale IoU om een detectie aan een track te koppelen
+        max_age: aantal frames zonder waarneming waarna een track vervalt
+    """
+
+    def __init__(self, iou_threshold=0.3, max_age=30):
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.tracks = []
+        self.next_id = 1
+        self.last_update = None
+
+    def update(self, frame_index, detections):
+        """
+        Verwerk de detecties van een keyframe (Detections of een lijst dicts).
+
+        Returns:
+            (tracked, new_tracks): Detections met track_ids, en de nieuw gestarte tracks
+        """
+        detections = as_detections(detections)
+
+        # Tracks die te lang niet gezien zijn vervallen
+        self.tracks = [t for t in self.tracks if frame_index - t.last_frame <= self.max_age]
+
+        matched_tracks = set()
+        matched_detections = set()
+
+        if self.tracks and detections:
+            predicted = [t.predicted_box(frame_index) for t in self.tracks]
+            ious = iou_matrix(predicted, detections.boxes)
+
+            # Alleen koppelen binnen dezelfde klasse
+            track_labels = np.array([t.label for t in self.tracks])
+            detection_labels = np.array(detections.labels)
+            ious[track_labels[:, None] != detection_labels[None, :]] = 0.0
+
+            # Greedy: hoogste IoU eerst
+            for flat_index in np.argsort(ious, axis=None)[::-1]:
+                t, d = np.unravel_index(flat_index, ious.shape)
+                if ious[t, d] < self.iou_threshold:
+                    break
+                if t in matched_tracks or d in matched_detections:
+                    continue
+                self.tracks[t].update(detections[d], frame_index)
+                matched_tracks.add(t)
+                matched_detections.add(d)
+
+        # Niet gekoppelde detecties starten een nieuwe track
+        new_tracks = []
+        for d, detection in enumerate(detections):
+            if d not in matched_detections:
+                track = Track(self.next_id, detection, frame_index)
+                self.next_id += 1
+                self.tracks.append(track)
+                new_tracks.append(track)
+
+        self.last_update = frame_index
+        tracked = [t.as_detection(frame_index) for t in self.tracks if t.last_frame == frame_index]
+        return Detections.from_dicts(tracked), new_tracks
+
+    def predict(self, frame_index):
+        """Voorspelde detecties voor een frame zonder detectie (tracks uit het laatste keyframe)"""
+        return Detections.from_dicts(
+            t.as_detection(frame_index) for t in self.tracks if t.last_frame == self.last_update)
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Threaded Video Pipeline
+=======================
+
+Drie stages die tegelijk draaien, verbonden door begrensde queues:
+
+    reader (decode)  ->  inference worker  ->  writer (encode)
+
+Zo zitten decode en encode niet stil terwijl het model rekent. De writer zet
+de frames terug in de originele volgorde. Na afloop wordt per stage de
+throughput en de queue-diepte gerapporteerd, zodat je ziet waar de bottleneck zit.
+
+Gebruik (via TRYME.py):
+    python TRYME.py --input video.mp4 --output result.mp4 --pipeline
+"""
+
+import queue
+import threading
+import time
+
+# Markeert het einde van de stream in een queue
+_END = object()
+
+# Een buffer wordt ook geleegd als er zoveel frames in zitten, niet pas na batch_size keyframes:
+# met een adaptief interval van 30 zouden dat er 240 zijn (~1,5 GB bij 1080p, ~10 s vertraging)
+MAX_BUFFER_FRAMES = 48
+
+
+class StageStats:
+    """Houdt bij hoeveel frames een stage verwerkt en hoe lang hij bezig was"""
+
+    def __init__(self, name):
+        self.name = name
+        self.frames = 0
+        self.busy_time = 0.0
+        self.queue_samples = 0
+        self.queue_total = 0
+        self.queue_max = 0
+
+    def sample_queue(self, q):
+        """Meet de diepte van de input-queue van deze stage"""
+        depth = q.qsize()
+        self.queue_samples += 1
+        self.queue_total += depth
+        self.queue_max = max(self.queue_max, depth)
+
+    @property
+    def fps(self):
+        return self.frames / self.busy_time if self.busy_time > 0 else 0.0
+
+    @property
+    def avg_queue(self):
+        return self.queue_total / self.queue_samples if self.queue_samples else 0.0
+
+
+def run_pipeline(read_frame, process_batch, write_frame, is_keyframe, batch_size=8, queue_size=32,
+                 stop_timeout=30, max_buffer_frames=MAX_BUFFER_FRAMES):
+    """
+    Verwerk een video met aparte threads voor lezen, detectie en schrijven.
+
+    Args:
+        read_frame: functie zonder argumenten die (ret, frame) teruggeeft, zoals cap.read
+        process_batch: functie die een lijst (is_keyframe, frame) verwerkt en per frame een resultaat teruggeeft
+        write_frame: functie (frame_index, resultaat) die één verwerkt frame wegschrijft
+        is_keyframe: functie frame_index -> bool, bepaalt welke frames naar het model gaan
+        batch_size: aantal keyframes per aanroep van process_batch
+        max_buffer_frames: process_batch ook aanroepen als er zoveel frames (keyframes of niet) wachten
+        queue_size: maximale lengte van de queues tussen de stages
+        stop_timeout: seconden om na Ctrl+C op de stages te wachten (een lopende batch maakt eerst af)
+
+    Returns:
+        dict: StageStats per stage plus de totale wall time
+    """
+    read_queue = queue.Queue(maxsize=queue_size)
+    write_queue = queue.Queue(maxsize=queue_size)
+    stats = {name: StageStats(name) for name in ("reader", "inference", "writer")}
+    errors = []
+    stop_event = threading.Event()
+
+    def put(q, item):
+        # Blokkeer niet voor altijd als een andere stage is gestopt
+        while not stop_event.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(q):
+        # Geeft _END terug als een andere stage is gestopt
+        while not stop_event.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _END
+
+    def reader():
+        stage = stats["reader"]
+        index = 0
+        try:
+            while not stop_event.is_set():
+                start = time.perf_counter()
+                ret, frame = read_frame()
+                stage.busy_time += time.perf_counter() - start
+                if not ret:
+                    break
+                stage.frames += 1
+                if not put(read_queue, (index, frame)):
+                    return
+                index += 1
+        except Exception as e:
+            errors.append(e)
+            stop_event.set()
+        finally:
+            put(read_queue, _END)
+
+    def inference():
+        stage = stats["inference"]
+        buffer = []
+        keyframes_in_buffer = 0
+        first_index = 0
+        buffer_limit = max(batch_size, max_buffer_frames)
+        try:
+            while True:
+                stage.sample_queue(read_queue)
+                item = get(read_queue)
+                done = item is _END
+
+                if not done:
+                    index, frame = item
+                    if not buffer:
+                        first_index = index
+                    keyframe = is_keyframe(index)
+                    buffer.append((keyframe, frame))
+                    keyframes_in_buffer += keyframe
+
+                if buffer and (keyframes_in_buffer >= batch_size or len(buffer) >= buffer_limit or done):
+                    start = time.perf_counter()
+                    outputs = process_batch(buffer)
+                    stage.busy_time += time.perf_counter() - start
+                    stage.frames += len(outputs)
+                    for offset, output in enumerate(outputs):
+                        if not put(write_queue, (first_index + offset, output)):
+                            return
+                    buffer = []
+                    keyframes_in_buffer = 0
+
+                if done:
+                    break
+        except Exception as e:
+            errors.append(e)
+            stop_event.set()
+        finally:
+            put(write_queue, _END)
+
+    def writer():
+        stage = stats["writer"]
+        # Frames die te vroeg binnenkomen wachten hier op hun beurt
+        pending = {}
+        next_index = 0
+        try:
+            while True:
+                stage.sample_queue(write_queue)
+                item = get(write_queue)
+                if item is _END:
+                    break
+                index, output = item
+                pending[index] = output
+                while next_index in pending:
+                    start = time.perf_counter()
+                    write_frame(next_index, pending.pop(next_index))
+                    stage.busy_time += time.perf_counter() - start
+                    stage.frames += 1
+                    next_index += 1
+        except Exception as e:
+            errors.append(e)
+            stop_event.set()
+
+    threads = [
+        threading.Thread(target=reader, name="reader", daemon=True),
+        threading.Thread(target=inference, name="inference", daemon=True),
+        threading.Thread(target=writer, name="writer", daemon=True),
+    ]
+
+    wall_start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(timeout=0.5)
+    except KeyboardInterrupt:
+        print("⏹️  Gestopt door gebruiker")
+        stop_event.set()
+        # Wachten tot de stages gestopt zijn: daarna sluit de aanroeper capture en writer
+        deadline = time.perf_counter() + stop_timeout
+        for thread in threads:
+            thread.join(timeout=max(0.0, deadline - time.perf_counter()))
+        still_running = [thread.name for thread in threads if thread.is_alive()]
+        if still_running:
+            print(f"⚠️  Na {stop_timeout:.0f}s nog niet gestopt: {', '.join(still_running)}")
+    wall_time = time.perf_counter() - wall_start
+
+    if errors:
+        raise errors[0]
+
+    return {"stages": stats, "wall_time": wall_time}
+
+
+def print_pipeline_report(report):
+    """Print throughput en queue-diepte per stage"""
+    stages = report["stages"]
+    wall_time = report["wall_time"]
+    frames = stages["writer"].frames
+
+    print(f"\n🧵 Pipeline rapport ({frames} frames in {wall_time:.1f}s, {frames / wall_time if wall_time else 0:.1f} FPS):")
+    print(f"  {'Stage':<10} {'Frames':<8} {'Bezig (s)':<10} {'FPS':<8} {'Queue avg':<10} {'Queue max'}")
+    for stage in stages.values():
+        print(f"  {stage.name:<10} {stage.frames:<8} {stage.busy_time:<10.2f} {stage.fps:<8.1f} "
+              f"{stage.avg_queue:<10.1f} {stage.queue_max}")
+
+    bottleneck = max(stages.values(), key=lambda s: s.busy_time)
+    print(f"  🐢 Bottleneck: {bottleneck.name}")
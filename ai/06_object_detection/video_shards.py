@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Video verwerken over meerdere processen
+=======================================
+
+Eén Python proces gebruikt maar één of twee cores. Voor lange video's knippen
+we de video in tijdsegmenten (seek met CAP_PROP_POS_FRAMES), laten we elk
+segment door een eigen proces met een eigen detector verwerken, en plakken we
+de resultaten daarna op volgorde weer aan elkaar:
+
+- geannoteerde video: de segment-video's achter elkaar (ffmpeg concat, of OpenCV)
+- JSON Lines resultaten: de segment-bestanden achter elkaar, track IDs uniek gemaakt
+- detection_stats: opgeteld per label
+
+Gebruik (via TRYME.py):
+    python TRYME.py --input video.mp4 --output result.mp4 --workers 8
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import json
+import multiprocessing
+import os
+from pathlib import Path
+import shutil
+import subprocess
+import tempfile
+import time
+
+import cv2
+
+from detection_stats import DetectionStats
+
+
+def split_segments(total_frames, workers):
+    """Verdeel [0, total_frames) in `workers` aaneengesloten (start, end) segmenten"""
+    workers = max(1, min(workers, total_frames))
+    size, rest = divmod(total_frames, workers)
+    segments = []
+    start = 0
+    for i in range(workers):
+        end = start + size + (1 if i < rest else 0)
+        segments.append((start, end))
+        start = end
+    return segments
+
+
+def threads_per_worker(workers):
+    """Verdeel de cores over de workers, zodat ze elkaar niet verdringen"""
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+def concat_videos(segment_paths, output_path, fps, size):
+    """Plak de segment-video's op volgorde aan elkaar"""
+    segment_paths = [p for p in segment_paths if Path(p).exists()]
+    if not segment_paths:
+        return
+
+    # Zonder her-encoderen via de ffmpeg concat demuxer als die er is
+    if shutil.which("ffmpeg"):
+        list_file = Path(segment_paths[0]).parent / "segments.txt"
+        list_file.write_text("".join(f"file '{Path(p).resolve()}'\n" for p in segment_paths))
+        result = subprocess.run(
+            ["ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+             "-i", str(list_file), "-c", "copy", str(output_path)],
+            capture_output=True, text=True,
+        )
+        if result.returncode == 0:
+            return
+        print(f"⚠️  ffmpeg concat mislukt, val terug op OpenCV: {result.stderr.strip()}")
+
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    writer = cv2.VideoWriter(str(output_path), fourcc, fps, size)
+    try:
+        for path in segment_paths:
+            cap = cv2.VideoCapture(str(path))
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                writer.write(frame)
+            cap.release()
+    finally:
+        writer.release()
+
+
+def concat_results(segment_paths, output_path):
+    """Plak JSON Lines bestanden aan elkaar; track IDs per segment worden verschoven zodat ze uniek blijven"""
+    id_offset = 0
+    with open(output_path, "w", encoding="utf-8") as out:
+        for path in segment_paths:
+            if not Path(path).exists():
+                continue
+            max_id = 0
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    record = json.loads(line)
+                    for detection in record["detections"]:
+                        if "track_id" in detection:
+                            max_id = max(max_id, detection["track_id"])
+                            detection["track_id"] += id_offset
+                    out.write(json.dumps(record) + "\n")
+            id_offset += max_id
+
+
+def _run_segment(segment_fn, video_path, start, end, output_path, results_path):
+    """Draait in het worker proces"""
+    return segment_fn(video_path, start, end, output_path, results_path)
+
+
+def process_video_sharded(video_path, segment_fn, output_path=None, results_path=None, workers=None):
+    """
+    Verwerk een video in segmenten, parallel over een process pool.
+
+    Args:
+        segment_fn: picklable functie (video_path, start_frame, end_frame,
+                    output_path, results_path) -> detection_stats, die in elk
+                    worker proces zijn eigen detector maakt
+        workers: aantal processen (default: aantal cores)
+
+    Returns:
+        DetectionStats: samengevoegd over alle segmenten
+    """
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        print(f"❌ Kan video niet openen: {video_path}")
+        return DetectionStats()
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+
+    if total_frames <= 0:
+        print("❌ Frame count onbekend, kan de video niet in segmenten knippen")
+        return DetectionStats()
+
+    workers = workers or os.cpu_count() or 1
+    segments = split_segments(total_frames, workers)
+    print(f"🧩 {len(segments)} segmenten over {len(segments)} processen "
+          f"({total_frames} frames, ~{segments[0][1] - segments[0][0]} per segment)")
+
+    temp_dir = Path(tempfile.mkdtemp(prefix="video_shards_"))
+    segment_outputs = [temp_dir / f"segment_{i:03d}.mp4" if output_path else None for i in range(len(segments))]
+    segment_results = [temp_dir / f"segment_{i:03d}.jsonl" if results_path else None for i in range(len(segments))]
+
+    start_time = time.perf_counter()
+    try:
+        # spawn: elk proces start schoon (veilig met torch threads)
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=len(segments), mp_context=context) as pool:
+            futures = [
+                pool.submit(_run_segment, segment_fn, video_path, start, end, out, res)
+                for (start, end), out, res in zip(segments, segment_outputs, segment_results)
+            ]
+            # Op volgorde ophalen, zodat de statistieken in segmentvolgorde samengevoegd worden
+            stats_list = [future.result() for future in futures]
+
+        if output_path:
+            concat_videos(segment_outputs, output_path, fps, size)
+            print(f"💾 Output opgeslagen: {output_path}")
+        if results_path:
+            concat_results(segment_results, results_path)
+            print(f"📝 Detecties opgeslagen: {results_path}")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    elapsed = time.perf_counter() - start_time
+    print(f"🧩 {total_frames} frames in {elapsed:.1f}s ({total_frames / elapsed:.1f} FPS) met {len(segments)} processen")
+    merged = DetectionStats()
+    for stats in stats_list:
+        merged.merge(stats)
+    return merged
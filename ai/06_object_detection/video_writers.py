@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Video writers
+=============
+
+Twee manieren om (geannoteerde) video te schrijven, met dezelfde interface
+als cv2.VideoWriter (write(frame), release()):
+
+    opencv   cv2.VideoWriter met mp4v, encodeert in de thread die write aanroept
+    ffmpeg   frames als ruwe pixels naar een ffmpeg proces; encoderen gebeurt
+             daar, met een instelbare codec (ook hardware: h264_nvenc,
+             h264_qsv, h264_videotoolbox), preset en aantal threads
+
+    encoder = VideoEncoder("ffmpeg", codec="libx264", preset="veryfast", threads=2)
+    writer = encoder.open("output.mp4", width, height, fps)
+    writer.write(frame)          # BGR frame (OpenCV)
+    writer.release()
+
+Is de video niet nodig, dan schrijft TRYME.py met --encoder none alleen de
+detecties (.jsonl sidecar naast --output) en wordt er niets getekend of
+geëncodeerd.
+"""
+
+from functools import lru_cache
+import subprocess
+
+import numpy as np
+
+# Optioneel: create_chair_video.py werkt ook zonder OpenCV (als ffmpeg er is)
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+ENCODERS = ["opencv", "ffmpeg", "none"]
+
+# Hoe elke codec zijn kwaliteit instelt (lager = beter); codecs die hier niet staan krijgen de ffmpeg default
+QUALITY_FLAGS = {
+    "libx264": "-crf", "libx265": "-crf", "libvpx-vp9": "-crf",
+    "h264_nvenc": "-cq", "hevc_nvenc": "-cq",
+    "h264_qsv": "-global_quality", "hevc_qsv": "-global_quality",
+}
+
+# De ffmpeg default voor x264/x265 is "medium": voor geannoteerde output onnodig langzaam
+DEFAULT_PRESETS = {"libx264": "veryfast", "libx265": "veryfast"}
+
+
+@lru_cache(maxsize=None)
+def ffmpeg_available():
+    """True als er een ffmpeg binary gestart kan worden"""
+    try:
+        subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
+        return True
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return False
+
+
+class FFmpegPipeWriter:
+    """
+    Stuurt ruwe frames naar de stdin van ffmpeg (geen tijdelijke bestanden).
+
+    Args:
+        pix_fmt: pixel formaat van de frames: "bgr24" (OpenCV) of "rgb24" (PIL)
+        codec: ffmpeg video codec, bijv. libx264, h264_nvenc, h264_qsv
+        preset: codec preset (x264: ultrafast..veryslow, nvenc: p1..p7); None = DEFAULT_PRESETS of ffmpeg default
+        threads: aantal encoder threads (None = ffmpeg kiest)
+        quality: crf/cq waarde als de codec in QUALITY_FLAGS staat
+    """
+
+    def __init__(self, output_path, width, height, fps, pix_fmt="bgr24", codec="libx264", preset=None,
+                 threads=None, quality=23):
+        cmd = [
+            'ffmpeg', '-y', '-loglevel', 'error',
+            '-f', 'rawvideo', '-pix_fmt', pix_fmt,
+            '-s', f'{width}x{height}', '-framerate', str(fps),
+            '-i', '-',  # frames komen via stdin
+            '-c:v', codec,
+            '-pix_fmt', 'yuv420p',
+        ]
+        preset = preset or DEFAULT_PRESETS.get(codec)
+        if preset:
+            cmd += ['-preset', preset]
+        if quality is not None and codec in QUALITY_FLAGS:
+            cmd += [QUALITY_FLAGS[codec], str(quality)]
+        if threads:
+            cmd += ['-threads', str(threads)]
+        cmd.append(str(output_path))
+        self.process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+        self.error = None
+
+    def write(self, frame):
+        """
+        frame: ruwe bytes of een (height, width, 3) uint8 array.
+
+        Is ffmpeg gestopt, dan een RuntimeError met de melding van ffmpeg.
+        """
+        if isinstance(frame, np.ndarray):
+            frame = np.ascontiguousarray(frame)
+        try:
+            self.process.stdin.write(frame)
+        except BrokenPipeError:
+            # ffmpeg is gestopt (bijv. onbekende codec of preset): zijn eigen melding zegt waarom
+            raise RuntimeError(f"ffmpeg: {self.close() or 'gestopt tijdens het schrijven'}") from None
+
+    def close(self):
+        """Rond de video af; geeft de foutmelding van ffmpeg terug, of None als het gelukt is"""
+        if self.process.returncode is not None:
+            return self.error  # al afgerond, bijv. door een mislukte write
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass
+        stderr = self.process.stderr.read().decode(errors="replace")
+        if self.process.wait() != 0:
+            self.error = stderr.strip() or "ffmpeg stopte met een fout"
+        return self.error
+
+    def release(self):
+        """Zoals cv2.VideoWriter.release, met een melding als ffmpeg faalde"""
+        error = self.close()
+        if error:
+            print(f"❌ ffmpeg: {error}")
+
+
+class OpenCVWriter:
+    """cv2.VideoWriter (mp4v), ook de fallback als ffmpeg ontbreekt"""
+
+    def __init__(self, output_path, width, height, fps, pix_fmt="bgr24"):
+        if cv2 is None:
+            raise RuntimeError("Geen ffmpeg en geen OpenCV beschikbaar om de video te schrijven")
+        self.shape = (height, width, 3)
+        self.rgb = pix_fmt == "rgb24"
+        self.writer = cv2.VideoWriter(str(output_path), cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+
+    def write(self, frame):
+        if not isinstance(frame, np.ndarray):
+            frame = np.frombuffer(frame, dtype=np.uint8).reshape(self.shape)
+        self.writer.write(cv2.cvtColor(frame, cv2.COLOR_RGB2BGR) if self.rgb else frame)
+
+    def close(self):
+        self.writer.release()
+        return None
+
+    def release(self):
+        self.close()
+
+
+class VideoEncoder:
+    """
+    Instellingen voor het schrijven van video; picklable, zodat --workers
+    processen dezelfde encoder gebruiken.
+
+    Args:
+        backend: "opencv" of "ffmpeg" (valt terug op opencv als ffmpeg ontbreekt)
+        codec, preset, threads, quality: zie FFmpegPipeWriter (alleen ffmpeg)
+    """
+
+    def __init__(self, backend="opencv", codec="libx264", preset=None, threads=None, quality=23):
+        if backend not in ("opencv", "ffmpeg"):
+            raise ValueError(f"Onbekende encoder: {backend} (kies opencv of ffmpeg)")
+        self.backend = backend
+        self.codec = codec
+        self.preset = preset
+        self.threads = threads
+        self.quality = quality
+
+    def open(self, output_path, width, height, fps, pix_fmt="bgr24"):
+        """Een writer met write(frame) en release()"""
+        if self.backend == "ffmpeg":
+            if ffmpeg_available():
+                return FFmpegPipeWriter(output_path, width, height, fps, pix_fmt, self.codec, self.preset,
+                                        self.threads, self.quality)
+            print("⚠️  FFmpeg niet gevonden, val terug op OpenCV (mp4v codec)")
+        return OpenCVWriter(output_path, width, height, fps, pix_fmt)
+
+    def describe(self):
+        if self.backend == "opencv":
+            return "OpenCV mp4v"
+        preset = self.preset or DEFAULT_PRESETS.get(self.codec)
+        details = [f"preset {preset}" if preset else None,
+                   f"{self.threads} threads" if self.threads else None]
+        details = ", ".join(d for d in details if d)
+        return f"ffmpeg {self.codec}" + (f" ({details})" if details else "")